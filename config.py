@@ -33,12 +33,26 @@ class Config:
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
     # default model; can be overridden in .env
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+    # lighter model for short compose bodies (higher rate limits)
+    GEMINI_COMPOSE_MODEL = os.getenv("GEMINI_COMPOSE_MODEL", "gemini-2.0-flash-lite")
     # quick toggle to disable Gemini and use templates only
     GEMINI_ENABLED = os.getenv("GEMINI_ENABLED", "true").lower() in ("1","true","yes")
+    # draft inbox replies with batched Gemini requests (off: Ollama, then template)
+    GEMINI_DRAFT_BATCH = os.getenv("GEMINI_DRAFT_BATCH", "false").lower() in ("1","true","yes")
+    # approx. characters of message bodies per summary prompt (spread across messages)
+    GEMINI_PROMPT_BUDGET = int(os.getenv("GEMINI_PROMPT_BUDGET", "12000"))
     
     # Agent settings
     PRIORITY_THRESHOLD = int(os.getenv("PRIORITY_THRESHOLD", "70"))
     MAX_EMAILS_TO_PROCESS = int(os.getenv("MAX_EMAILS_TO_PROCESS", "100"))
+    # worker threads used to run the per-email pipeline over a batch
+    PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "8"))
+    # max concurrent Gmail API requests per client (draft submissions, gets, sends)
+    GMAIL_CONCURRENCY = int(os.getenv("GMAIL_CONCURRENCY", "10"))
+    # attempts per Gmail API request on rate-limit/transient errors
+    GMAIL_MAX_ATTEMPTS = int(os.getenv("GMAIL_MAX_ATTEMPTS", "5"))
+    # distinct senders whose classification is memoized
+    SENDER_CACHE_SIZE = int(os.getenv("SENDER_CACHE_SIZE", "4096"))
     
     # Domain configuration (comma-separated lists in .env)
     VIP_DOMAINS: Set[str] = set(filter(None, map(str.strip, os.getenv("VIP_DOMAINS", "").split(","))))
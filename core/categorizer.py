@@ -3,7 +3,7 @@ S6-S7: Email Categorization
 Assigns emails to categories (action, FYI, waiting, spam, legal, finance)
 """
 import logging
-from models import EmailCategory, IntentDetection, PriorityScore
+from models import EmailCategory, IntentDetection, IntentFlag, PriorityScore
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +11,8 @@ logger = logging.getLogger(__name__)
 class EmailCategorizer:
     """Categorizes emails based on intent and priority"""
     
+    __slots__ = ()
+    
     def categorize(self, intent: IntentDetection, 
                    priority: PriorityScore,
                    is_spam: bool) -> EmailCategory:
@@ -19,39 +21,38 @@ class EmailCategorizer:
         
         Assigns email to appropriate category
         """
-        logger.debug(f"Categorizing email with intent: {intent.primary_intent}")
+        logger.debug("Categorizing email with intent: %s", intent.primary_intent)
         
+        category = self._resolve_category(intent, is_spam)
+        if category is not EmailCategory.SPAM:
+            logger.info("Categorized as %s", category.name)
+        return category
+    
+    def _resolve_category(self, intent: IntentDetection, is_spam: bool) -> EmailCategory:
+        """Apply the categorization rules in precedence order"""
         # Spam takes precedence
         if is_spam:
             return EmailCategory.SPAM
         
+        mask = intent.intent_mask
+        
         # Legal category
-        if 'legal' in intent.intents:
-            logger.info("Categorized as LEGAL")
+        if mask & IntentFlag.LEGAL:
             return EmailCategory.LEGAL
         
         # Finance category
-        if 'finance' in intent.intents:
-            logger.info("Categorized as FINANCE")
+        if mask & IntentFlag.FINANCE:
             return EmailCategory.FINANCE
         
         # Action required
         if intent.action_required or intent.question_detected:
-            logger.info("Categorized as ACTION")
             return EmailCategory.ACTION
         
         # Waiting (no action but not FYI)
-        if 'request' in intent.intents or 'meeting' in intent.intents:
-            logger.info("Categorized as WAITING")
+        if mask & (IntentFlag.REQUEST | IntentFlag.MEETING):
             return EmailCategory.WAITING
         
-        # FYI (informational only)
-        if intent.primary_intent in ['informational', 'notification']:
-            logger.info("Categorized as FYI")
-            return EmailCategory.FYI
-        
-        # Default to FYI if uncertain
-        logger.info("Categorized as FYI (default)")
+        # FYI (informational only), also the default if uncertain
         return EmailCategory.FYI
     
     def categorization_base_update(self, email_id: str, category: EmailCategory):
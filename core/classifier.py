@@ -2,23 +2,54 @@
 S1: Sender Classification
 Identifies sender type and importance
 """
+import functools
 import logging
 import re
-from typing import List
+from typing import List, Set, Tuple
 from config import Config
 from models import ClassificationResult, SenderType, EmailMetadata
 
 logger = logging.getLogger(__name__)
 
+_DOMAIN_RE = re.compile(r'@([\w.-]+)')
+_DIGIT_RUN_RE = re.compile(r'\d{4,}')
+
+# VIP titles in the address (CEO, founder, board, etc.)
+_VIP_KW_RE = re.compile(r'\b(ceo|founder|president|board|director|vp|cfo|cto)\b', re.IGNORECASE)
+
+# Generic free email providers
+_FREE_PROVIDERS = frozenset({'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com'})
+
+# Bulk/automated sender address fragments
+_SPAM_SENDER_PATTERNS = (
+    'noreply', 'no-reply', 'donotreply', 'notification',
+    'marketing', 'newsletter', 'promo', 'deals'
+)
+
 
 class SenderClassifier:
     """Classifies email senders"""
     
+    __slots__ = (
+        'vip_domains', 'vip_emails', 'known_vendors', 'team_domains',
+        '_vip_emails_lc', '_vendors_lc', '_classify_sender'
+    )
+    
     def __init__(self):
         self.vip_domains = Config.VIP_DOMAINS
         self.vip_emails: List[str] = []  # Can be loaded from database
         self.known_vendors: List[str] = []  # Can be loaded from database
-        self.team_domains: List[str] = []  # Internal company domains
+        self.team_domains: Set[str] = set()  # Internal company domains
+        
+        # Lowercased lookup sets, kept in sync by add_vip/add_vendor
+        self._vip_emails_lc: Set[str] = set()
+        self._vendors_lc: Set[str] = set()
+        
+        # Per-sender result cache; cleared whenever the VIP/vendor lists change.
+        # Spam scoring is not cached here: it also depends on labels and content.
+        self._classify_sender = functools.lru_cache(
+            maxsize=Config.SENDER_CACHE_SIZE
+        )(self._classify_sender_uncached)
     
     def classify(self, metadata: EmailMetadata) -> ClassificationResult:
         """
@@ -27,9 +58,28 @@ class SenderClassifier:
         Analyzes sender and determines their type and importance
         """
         sender_email = metadata.sender
-        sender_domain = self._extract_domain(sender_email)
         
-        logger.debug(f"Classifying sender: {sender_email}")
+        logger.debug("Classifying sender: %s", sender_email)
+        
+        (sender_type, sender_domain, is_vip,
+         is_internal, confidence, notes) = self._classify_sender(sender_email)
+        
+        result = ClassificationResult(
+            sender_type=sender_type,
+            sender_email=sender_email,
+            sender_domain=sender_domain,
+            is_vip=is_vip,
+            is_internal=is_internal,
+            confidence=confidence,
+            notes=notes
+        )
+        
+        logger.info("Classified %s as %s (VIP: %s)", sender_email, sender_type.value, is_vip)
+        return result
+    
+    def _classify_sender_uncached(self, sender_email: str) -> Tuple[SenderType, str, bool, bool, float, str]:
+        """Classify a sender address (wrapped by the per-sender LRU cache)"""
+        sender_domain = self._extract_domain(sender_email)
         
         # Determine sender type
         sender_type = self._determine_sender_type(sender_email, sender_domain)
@@ -44,28 +94,19 @@ class SenderClassifier:
             sender_type, is_vip, is_internal, sender_domain
         )
         
-        result = ClassificationResult(
-            sender_type=sender_type,
-            sender_email=sender_email,
-            sender_domain=sender_domain,
-            is_vip=is_vip,
-            is_internal=is_internal,
-            confidence=confidence,
-            notes=notes
-        )
-        
-        logger.info(f"Classified {sender_email} as {sender_type.value} (VIP: {is_vip})")
-        return result
+        return sender_type, sender_domain, is_vip, is_internal, confidence, notes
     
     def _extract_domain(self, email: str) -> str:
         """Extract domain from email address"""
-        match = re.search(r'@([\w\.-]+)', email)
+        match = _DOMAIN_RE.search(email)
         return match.group(1) if match else ""
     
     def _determine_sender_type(self, email: str, domain: str) -> SenderType:
         """Determine the type of sender"""
+        email_lower = email.lower()
+        
         # Check if VIP
-        if email.lower() in [v.lower() for v in self.vip_emails]:
+        if email_lower in self._vip_emails_lc:
             return SenderType.VIP
         
         if domain in self.vip_domains:
@@ -76,7 +117,7 @@ class SenderClassifier:
             return SenderType.TEAM
         
         # Check known vendors
-        if email.lower() in [v.lower() for v in self.known_vendors]:
+        if email_lower in self._vendors_lc:
             return SenderType.VENDOR
         
         # Check for common spam patterns
@@ -91,8 +132,10 @@ class SenderClassifier:
     
     def _is_vip(self, email: str, domain: str) -> bool:
         """Check if sender is VIP"""
+        email_lower = email.lower()
+        
         # Explicit VIP list
-        if email.lower() in [v.lower() for v in self.vip_emails]:
+        if email_lower in self._vip_emails_lc:
             return True
         
         # VIP domain
@@ -100,33 +143,23 @@ class SenderClassifier:
             return True
         
         # VIP keywords in name (CEO, founder, board, etc.)
-        vip_keywords = ['ceo', 'founder', 'president', 'board', 'director', 'vp', 'cfo', 'cto']
-        email_lower = email.lower()
-        
-        for keyword in vip_keywords:
-            if keyword in email_lower:
-                return True
+        if _VIP_KW_RE.search(email):
+            return True
         
         return False
     
     def _looks_like_spam(self, email: str, domain: str) -> bool:
         """Check if sender looks like spam"""
-        spam_patterns = [
-            'noreply', 'no-reply', 'donotreply', 'notification',
-            'marketing', 'newsletter', 'promo', 'deals'
-        ]
-        
         email_lower = email.lower()
-        for pattern in spam_patterns:
+        for pattern in _SPAM_SENDER_PATTERNS:
             if pattern in email_lower:
                 return True
         
         # Generic free email providers + random chars pattern
-        free_providers = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com']
-        if domain in free_providers:
+        if domain in _FREE_PROVIDERS:
             # Check for random character patterns
-            local_part = email.split('@')[0]
-            if len(local_part) > 15 or re.search(r'\d{4,}', local_part):
+            local_part = email.partition('@')[0]
+            if len(local_part) > 15 or _DIGIT_RUN_RE.search(local_part):
                 return True
         
         return False
@@ -134,9 +167,7 @@ class SenderClassifier:
     def _looks_like_customer(self, email: str, domain: str) -> bool:
         """Check if sender looks like a customer"""
         # Has professional domain (not free email)
-        free_providers = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com']
-        
-        if domain not in free_providers and '.' in domain:
+        if domain not in _FREE_PROVIDERS and '.' in domain:
             return True
         
         return False
@@ -178,10 +209,14 @@ class SenderClassifier:
         """Add email to VIP list"""
         if email not in self.vip_emails:
             self.vip_emails.append(email)
+            self._vip_emails_lc.add(email.lower())
+            self._classify_sender.cache_clear()
             logger.info(f"Added {email} to VIP list")
     
     def add_vendor(self, email: str):
         """Add email to vendor list"""
         if email not in self.known_vendors:
             self.known_vendors.append(email)
+            self._vendors_lc.add(email.lower())
+            self._classify_sender.cache_clear()
             logger.info(f"Added {email} to vendor list")
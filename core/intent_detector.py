@@ -4,16 +4,47 @@ Detects email intent and extracts key information
 """
 import logging
 import re
-from typing import List, Set
+from typing import Dict, List
 from config import Config
-from models import IntentDetection, EmailMetadata
+from models import IntentDetection, IntentFlag, EmailMetadata
+from .keyword_matcher import KeywordMatcher
+
+try:
+    import re2
+except ImportError:
+    re2 = None
 
 logger = logging.getLogger(__name__)
 
+# Deadline patterns, fused into one alternation so the text is scanned once.
+# Uses the RE2 (DFA) engine when google-re2 is installed.
+_DEADLINE_PATTERNS = [
+    r'\d{1,2}/\d{1,2}/\d{2,4}',  # MM/DD/YYYY
+    r'\d{1,2}-\d{1,2}-\d{2,4}',  # MM-DD-YYYY
+    r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
+    r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]* \d{1,2}',  # Month Day
+    r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)',  # Day of week
+    r'(today|tomorrow|tonight|next week|this week)'  # Relative dates
+]
+_DEADLINES_RE = (re2 or re).compile(
+    "|".join(f"(?P<g{i}>{p})" for i, p in enumerate(_DEADLINE_PATTERNS))
+)
+
+# Question word at the start of a sentence
+_Q_RE = re.compile(r'\s*(?:how|what|when|where|why|who)\b', re.IGNORECASE)
+
 
 class IntentDetector:
     """Detects intent and keywords in emails"""
     
+    __slots__ = (
+        'urgency_keywords', 'legal_keywords', 'finance_keywords', 'action_keywords',
+        'meeting_keywords', 'notification_keywords', 'complaint_keywords', 'sales_keywords'
+    )
+    
+    # Shared keyword matcher, built once per process
+    _matcher = None
+    
     def __init__(self):
         self.urgency_keywords = Config.URGENCY_KEYWORDS
         self.legal_keywords = Config.LEGAL_KEYWORDS
@@ -25,8 +56,36 @@ class IntentDetector:
             'need', 'require', 'request', 'asking', 'help'
         ]
         
-        # Question indicators
-        self.question_indicators = ['?', 'how', 'what', 'when', 'where', 'why', 'who']
+        # Intent keywords
+        self.meeting_keywords = [
+            'meeting', 'call', 'schedule', 'calendar',
+            'available', 'time to talk', 'discuss', 'zoom', 'teams'
+        ]
+        self.notification_keywords = [
+            'notification', 'alert', 'reminder', 'update',
+            'fyi', 'for your information', 'heads up'
+        ]
+        self.complaint_keywords = [
+            'complaint', 'issue', 'problem', 'disappointed',
+            'unhappy', 'dissatisfied', 'not working', 'broken',
+            'frustrated', 'unacceptable'
+        ]
+        self.sales_keywords = [
+            'offer', 'discount', 'sale', 'promotion', 'deal',
+            'limited time', 'special', 'buy now', 'save'
+        ]
+        
+        if IntentDetector._matcher is None:
+            IntentDetector._matcher = KeywordMatcher({
+                'urgency': self.urgency_keywords,
+                'legal': self.legal_keywords,
+                'finance': self.finance_keywords,
+                'action': self.action_keywords,
+                'meeting': self.meeting_keywords,
+                'notification': self.notification_keywords,
+                'complaint': self.complaint_keywords,
+                'sales': self.sales_keywords
+            })
     
     def detect(self, metadata: EmailMetadata) -> IntentDetection:
         """
@@ -34,103 +93,95 @@ class IntentDetector:
         
         Analyzes email content to determine intent and extract keywords
         """
-        logger.debug(f"Detecting intent for: {metadata.subject}")
+        logger.debug("Detecting intent for: %s", metadata.subject)
         
         # Combine subject and body for analysis
-        full_text = f"{metadata.subject}\n{metadata.body_text}".lower()
+        full_text = metadata.full_text_lower
         
-        # Detect keywords
-        urgency_found = self._find_keywords(full_text, self.urgency_keywords)
-        legal_found = self._find_keywords(full_text, self.legal_keywords)
-        finance_found = self._find_keywords(full_text, self.finance_keywords)
-        action_found = self._find_keywords(full_text, self.action_keywords)
+        # Detect keywords (single scan over the text)
+        found = self._matcher.find(full_text)
+        urgency_found = found['urgency']
+        legal_found = found['legal']
+        finance_found = found['finance']
+        action_found = found['action']
         
         # Combine all keywords
-        all_keywords = urgency_found + legal_found + finance_found + action_found
+        all_keywords = set(urgency_found)
+        all_keywords.update(legal_found, finance_found, action_found)
+        keyword_hits = len(urgency_found) + len(legal_found) + len(finance_found) + len(action_found)
         
         # Detect question
         question_detected = self._is_question(full_text, metadata.subject)
         
         # Determine intents
-        intents = self._determine_intents(
-            urgency_found, legal_found, finance_found,
-            action_found, question_detected, full_text
-        )
+        intents = self._determine_intents(found, question_detected)
+        intent_mask = IntentFlag.from_names(intents)
         
         # Determine primary intent
         primary_intent = intents[0] if intents else "informational"
         
         # Determine if action required
-        action_required = (
-            len(action_found) > 0 or
+        action_required = bool(
+            action_found or
             question_detected or
-            'action' in intents or
-            'request' in intents
+            intent_mask & IntentFlag.REQUEST
         )
         
         # Calculate confidence
-        confidence = self._calculate_confidence(intents, all_keywords)
+        confidence = self._calculate_confidence(intents, keyword_hits)
         
         result = IntentDetection(
             primary_intent=primary_intent,
             intents=intents,
-            keywords_detected=list(set(all_keywords)),
+            keywords_detected=list(all_keywords),
             urgency_keywords=urgency_found,
             action_required=action_required,
             question_detected=question_detected,
-            confidence=confidence
+            confidence=confidence,
+            intent_mask=intent_mask
         )
         
-        logger.info(f"Detected intent: {primary_intent} (action required: {action_required})")
+        logger.info("Detected intent: %s (action required: %s)", primary_intent, action_required)
         return result
     
-    def _find_keywords(self, text: str, keyword_list: List[str]) -> List[str]:
-        """Find keywords in text"""
-        found = []
-        for keyword in keyword_list:
-            if keyword.lower() in text:
-                found.append(keyword)
-        return found
-    
     def _is_question(self, text: str, subject: str) -> bool:
         """Detect if email is asking a question"""
         # Check for question mark
-        if '?' in subject or text.count('?') > 0:
+        if '?' in subject or '?' in text:
             return True
         
-        # Check for question words at start of sentences
-        sentences = text.split('.')
-        for sentence in sentences[:3]:  # Check first 3 sentences
-            sentence = sentence.strip().lower()
-            for indicator in self.question_indicators:
-                if sentence.startswith(indicator):
-                    return True
+        # Check for question words at start of the first 3 sentences,
+        # without splitting the whole body
+        start = 0
+        for _ in range(3):
+            end = text.find('.', start)
+            if _Q_RE.match(text, start, end if end >= 0 else len(text)):
+                return True
+            if end < 0:
+                break
+            start = end + 1
         
         return False
     
-    def _determine_intents(self, urgency_found: List[str],
-                          legal_found: List[str],
-                          finance_found: List[str],
-                          action_found: List[str],
-                          question_detected: bool,
-                          full_text: str) -> List[str]:
+    def _determine_intents(self, found: Dict[str, List[str]],
+                          question_detected: bool) -> List[str]:
         """Determine all applicable intents"""
         intents = []
         
         # Urgent intent
-        if urgency_found:
+        if found['urgency']:
             intents.append('urgent')
         
         # Legal intent
-        if legal_found:
+        if found['legal']:
             intents.append('legal')
         
         # Finance intent
-        if finance_found:
+        if found['finance']:
             intents.append('finance')
         
         # Action/request intent
-        if action_found:
+        if found['action']:
             intents.append('request')
         
         # Question intent
@@ -138,19 +189,19 @@ class IntentDetector:
             intents.append('question')
         
         # Meeting request
-        if self._is_meeting_request(full_text):
+        if found['meeting']:
             intents.append('meeting')
         
         # Notification
-        if self._is_notification(full_text):
+        if found['notification']:
             intents.append('notification')
         
         # Complaint
-        if self._is_complaint(full_text):
+        if found['complaint']:
             intents.append('complaint')
         
         # Sales/promotional
-        if self._is_sales(full_text):
+        if found['sales']:
             intents.append('sales')
         
         # If no specific intent, it's informational
@@ -159,66 +210,18 @@ class IntentDetector:
         
         return intents
     
-    def _is_meeting_request(self, text: str) -> bool:
-        """Detect meeting request"""
-        meeting_keywords = [
-            'meeting', 'call', 'schedule', 'calendar',
-            'available', 'time to talk', 'discuss', 'zoom', 'teams'
-        ]
-        return any(keyword in text for keyword in meeting_keywords)
-    
-    def _is_notification(self, text: str) -> bool:
-        """Detect notification email"""
-        notification_keywords = [
-            'notification', 'alert', 'reminder', 'update',
-            'fyi', 'for your information', 'heads up'
-        ]
-        return any(keyword in text for keyword in notification_keywords)
-    
-    def _is_complaint(self, text: str) -> bool:
-        """Detect complaint"""
-        complaint_keywords = [
-            'complaint', 'issue', 'problem', 'disappointed',
-            'unhappy', 'dissatisfied', 'not working', 'broken',
-            'frustrated', 'unacceptable'
-        ]
-        return any(keyword in text for keyword in complaint_keywords)
-    
-    def _is_sales(self, text: str) -> bool:
-        """Detect sales/promotional email"""
-        sales_keywords = [
-            'offer', 'discount', 'sale', 'promotion', 'deal',
-            'limited time', 'special', 'buy now', 'save'
-        ]
-        return any(keyword in text for keyword in sales_keywords)
-    
     def _calculate_confidence(self, intents: List[str],
-                             keywords: List[str]) -> float:
+                             keyword_hits: int) -> float:
         """Calculate detection confidence"""
         # More intents and keywords = higher confidence
         intent_score = min(len(intents) * 0.2, 0.6)
-        keyword_score = min(len(keywords) * 0.05, 0.4)
+        keyword_score = min(keyword_hits * 0.05, 0.4)
         
         confidence = intent_score + keyword_score
         return min(confidence, 1.0)
     
     def extract_deadlines(self, metadata: EmailMetadata) -> List[str]:
         """Extract deadline mentions from email"""
-        text = f"{metadata.subject}\n{metadata.body_text}"
-        
-        # Regex patterns for dates
-        date_patterns = [
-            r'\d{1,2}/\d{1,2}/\d{2,4}',  # MM/DD/YYYY
-            r'\d{1,2}-\d{1,2}-\d{2,4}',  # MM-DD-YYYY
-            r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-            r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]* \d{1,2}',  # Month Day
-            r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)',  # Day of week
-            r'(today|tomorrow|tonight|next week|this week)'  # Relative dates
-        ]
-        
-        deadlines = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text.lower())
-            deadlines.extend(matches)
+        deadlines = {m.group(0) for m in _DEADLINES_RE.finditer(metadata.full_text_lower)}
         
-        return list(set(deadlines))
+        return list(deadlines)
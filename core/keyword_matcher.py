@@ -0,0 +1,80 @@
+"""
+Keyword Matcher
+Finds several keyword groups in a text with a single scan
+"""
+from collections import Counter
+from typing import Dict, List, Sequence
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Multi-pattern substring matcher.
+
+    With pyahocorasick installed every keyword of every group is compiled
+    into one Aho-Corasick automaton, so a text is walked once no matter how
+    many keywords there are. Without it the matcher falls back to plain
+    substring checks. Both paths report the same keywords.
+    """
+
+    def __init__(self, groups: Dict[str, Sequence[str]]):
+        self.groups = {name: list(keywords) for name, keywords in groups.items()}
+
+        # (needle, keyword) pairs per group, lowercased once up front
+        self._pairs = {
+            name: tuple((kw.lower(), kw) for kw in keywords)
+            for name, keywords in self.groups.items()
+        }
+        self._needles = tuple(dict.fromkeys(
+            needle for pairs in self._pairs.values() for needle, _ in pairs
+        ))
+        self._automaton = None
+
+        if ahocorasick is not None and self._needles:
+            automaton = ahocorasick.Automaton()
+            for needle in self._needles:
+                automaton.add_word(needle, needle)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def find(self, text: str) -> Dict[str, List[str]]:
+        """
+        Return the keywords of each group found in text
+
+        text is expected to be lowercase already. Keywords keep the order
+        of their group, matching a `keyword in text` loop.
+        """
+        if self._automaton is None:
+            return {
+                name: [kw for needle, kw in pairs if needle in text]
+                for name, pairs in self._pairs.items()
+            }
+
+        hits = {needle for _, needle in self._automaton.iter(text)}
+        return {
+            name: [kw for needle, kw in pairs if needle in hits]
+            for name, pairs in self._pairs.items()
+        }
+
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        Count occurrences of every keyword in text
+
+        Returns a mapping of lowercased keyword to hit count; keywords that
+        do not occur are absent. text is expected to be lowercase already.
+        """
+        if self._automaton is None:
+            # str.count already uses CPython's fastsearch (same as bytes.count);
+            # encoding the text first would only add a copy
+            counts = {}
+            for needle in self._needles:
+                hits = text.count(needle)
+                if hits:
+                    counts[needle] = hits
+            return counts
+
+        return Counter(needle for _, needle in self._automaton.iter(text))
@@ -4,14 +4,50 @@ Calculates priority score based on multiple factors
 """
 import logging
 from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
 from config import Config
 from models import (
     PriorityScore, PriorityLevel, EmailMetadata,
-    ClassificationResult, IntentDetection
+    ClassificationResult, IntentDetection, IntentFlag
 )
 
 logger = logging.getLogger(__name__)
 
+# Email age thresholds and their points, newest first
+_AGE_SCORES = (
+    (timedelta(hours=1), 10),
+    (timedelta(hours=4), 8),
+    (timedelta(days=1), 5),
+    (timedelta(days=3), 2),
+)
+
+# Points per sender type (VIP flag overrides to 40)
+_SENDER_SCORES = {
+    'vip': 40,
+    'team': 30,
+    'customer': 25,
+    'vendor': 15,
+    'unknown': 5,
+    'spam': 0
+}
+
+# Hidden urgency: polite language and deadline mentions
+_POLITE_INDICATORS = ('please', 'kindly', 'would you', 'could you',
+                      'at your convenience', 'when possible')
+_DEADLINE_INDICATORS = ('deadline', 'due date', 'by end of', 'before',
+                        'tomorrow', 'today', 'asap', 'eod', 'eow')
+
+# Readable reason per scoring factor
+_FACTOR_REASONS = {
+    'sender_importance': "Important sender (+{})",
+    'urgency_keywords': "Urgent keywords (+{})",
+    'action_required': "Action needed (+{})",
+    'email_age': "Recent email (+{})",
+    'thread_context': "Active thread (+{})",
+    'special_category': "Special category (+{})",
+    'hidden_urgency': "Hidden urgency (+{})"
+}
+
 
 class PriorityScorer:
     """Calculates email priority scores"""
@@ -19,10 +55,20 @@ class PriorityScorer:
     def __init__(self):
         self.threshold = Config.PRIORITY_THRESHOLD
     
+    def score_batch(self, items: Sequence[Tuple[EmailMetadata, ClassificationResult, IntentDetection]]
+                    ) -> List[PriorityScore]:
+        """Score many emails against a single clock reading"""
+        now = datetime.now().astimezone()
+        return [
+            self.calculate_score(metadata, classification, intent, now)
+            for metadata, classification, intent in items
+        ]
+    
     def calculate_score(self,
                        metadata: EmailMetadata,
                        classification: ClassificationResult,
-                       intent: IntentDetection) -> PriorityScore:
+                       intent: IntentDetection,
+                       now: Optional[datetime] = None) -> PriorityScore:
         """
         S3: Priority Scoring Engine
         
@@ -33,6 +79,9 @@ class PriorityScorer:
         - Question/action required
         - Email age
         - Hidden urgency detection (PRD requirement)
+        
+        now is the timezone-aware local time to measure email age against
+        (defaults to the current time).
         """
         logger.debug(f"Calculating priority for: {metadata.subject}")
         
@@ -62,7 +111,7 @@ class PriorityScorer:
             evidence.append("Action required")
         
         # Factor 4: Email age (0-10 points)
-        age_score = self._score_age(metadata.date)
+        age_score = self._score_age(metadata.date, now or datetime.now().astimezone())
         factors['email_age'] = age_score
         score += age_score
         
@@ -113,16 +162,7 @@ class PriorityScorer:
         if classification.is_vip:
             return 40
         
-        sender_scores = {
-            'vip': 40,
-            'team': 30,
-            'customer': 25,
-            'vendor': 15,
-            'unknown': 5,
-            'spam': 0
-        }
-        
-        return sender_scores.get(classification.sender_type.value, 5)
+        return _SENDER_SCORES.get(classification.sender_type.value, 5)
     
     def _score_urgency(self, intent: IntentDetection) -> int:
         """Score based on urgency keywords (0-20)"""
@@ -149,26 +189,16 @@ class PriorityScorer:
         
         return min(score, 15)
     
-    def _score_age(self, email_date: datetime) -> int:
+    def _score_age(self, email_date: datetime, now: datetime) -> int:
         """Score based on email age (0-10) - newer = higher"""
-        now = datetime.now(email_date.tzinfo) if email_date.tzinfo else datetime.now()
-        age = now - email_date
-        
-        # Less than 1 hour = 10 points
-        if age < timedelta(hours=1):
-            return 10
-        # Less than 4 hours = 8 points
-        elif age < timedelta(hours=4):
-            return 8
-        # Less than 24 hours = 5 points
-        elif age < timedelta(days=1):
-            return 5
-        # Less than 3 days = 2 points
-        elif age < timedelta(days=3):
-            return 2
-        # Older = 0 points
-        else:
-            return 0
+        # Naive dates are local time: compare against the naive local clock
+        age = (now if email_date.tzinfo else now.replace(tzinfo=None)) - email_date
+        
+        # <1h = 10, <4h = 8, <24h = 5, <3 days = 2, older = 0
+        for limit, points in _AGE_SCORES:
+            if age < limit:
+                return points
+        return 0
     
     def _score_thread(self, metadata: EmailMetadata) -> int:
         """Score based on thread context (0-10)"""
@@ -194,12 +224,10 @@ class PriorityScorer:
         score = 0
         
         # Legal or finance = high priority bonus
-        if 'legal' in intent.intents:
-            score += 5
-        elif 'finance' in intent.intents:
+        if intent.intent_mask & (IntentFlag.LEGAL | IntentFlag.FINANCE):
             score += 5
         # Complaint = medium priority bonus
-        elif 'complaint' in intent.intents:
+        elif intent.intent_mask & IntentFlag.COMPLAINT:
             score += 3
         
         return min(score, 5)
@@ -252,21 +280,14 @@ class PriorityScorer:
         """
         evidence = []
         
-        # Check for polite language without obvious urgency keywords
-        polite_indicators = ['please', 'kindly', 'would you', 'could you', 
-                            'at your convenience', 'when possible']
-        deadline_indicators = ['deadline', 'due date', 'by end of', 'before',
-                              'tomorrow', 'today', 'asap', 'eod', 'eow']
-        
-        body_lower = metadata.body_text.lower()
-        subject_lower = metadata.subject.lower()
-        combined_text = body_lower + " " + subject_lower
+        # Lowercased subject and body, shared with the intent detector
+        combined_text = metadata.full_text_lower
         
-        # Check for polite language
-        is_polite = any(phrase in combined_text for phrase in polite_indicators)
+        # Check for polite language without obvious urgency keywords
+        is_polite = any(phrase in combined_text for phrase in _POLITE_INDICATORS)
         
         # Check for deadline mentions
-        has_deadline = any(word in combined_text for word in deadline_indicators)
+        has_deadline = any(word in combined_text for word in _DEADLINE_INDICATORS)
         
         # Check for low urgency keywords but deadline present
         has_low_urgency_keywords = len(intent.urgency_keywords) <= 1
@@ -301,14 +322,5 @@ class PriorityScorer:
     
     def _factor_to_reason(self, factor_name: str, score: int) -> str:
         """Convert factor name and score to readable reason"""
-        reason_map = {
-            'sender_importance': f"Important sender (+{score})",
-            'urgency_keywords': f"Urgent keywords (+{score})",
-            'action_required': f"Action needed (+{score})",
-            'email_age': f"Recent email (+{score})",
-            'thread_context': f"Active thread (+{score})",
-            'special_category': f"Special category (+{score})",
-            'hidden_urgency': f"Hidden urgency (+{score})"
-        }
-        
-        return reason_map.get(factor_name, "")
+        template = _FACTOR_REASONS.get(factor_name)
+        return template.format(score) if template else ""
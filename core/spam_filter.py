@@ -5,15 +5,32 @@ Detects spam and promotional emails
 import logging
 from config import Config
 from models import EmailMetadata, ClassificationResult, SenderType
+from .keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
+# Score at or above which an email is treated as spam
+SPAM_THRESHOLD = 50
+
 
 class SpamFilter:
     """Detects spam emails"""
     
+    __slots__ = ('spam_indicators', '_indicators_lc')
+    
+    # Shared content matcher, built once per process
+    _matcher = None
+    
     def __init__(self):
         self.spam_indicators = Config.SPAM_INDICATORS
+        self._indicators_lc = tuple(i.lower() for i in self.spam_indicators)
+        
+        # Every content needle in one matcher so the body is scanned once
+        if SpamFilter._matcher is None:
+            SpamFilter._matcher = KeywordMatcher({
+                'indicators': self.spam_indicators,
+                'markers': ['unsubscribe', 'http', 'click here']
+            })
     
     def is_spam(self, metadata: EmailMetadata,
                 classification: ClassificationResult) -> bool:
@@ -22,45 +39,57 @@ class SpamFilter:
         
         Determines if email is spam based on multiple signals
         """
-        logger.debug(f"Checking spam for: {metadata.subject}")
+        logger.debug("Checking spam for: %s", metadata.subject)
         
         spam_score = 0
         
-        # Signal 1: Sender classified as spam
-        if classification.sender_type == SenderType.SPAM:
-            spam_score += 40
-        
-        # Signal 2: Spam keywords in subject/body
-        text = f"{metadata.subject}\n{metadata.body_text}".lower()
-        spam_keyword_count = sum(1 for indicator in self.spam_indicators 
-                                if indicator in text)
-        spam_score += min(spam_keyword_count * 10, 30)
+        # Cheap metadata signals first; the body is only scanned if they
+        # have not already decided the verdict
         
         # Signal 3: Already in spam label
         if 'SPAM' in metadata.labels:
             spam_score += 50
         
-        # Signal 4: Unsubscribe link present (marketing)
-        if 'unsubscribe' in text:
-            spam_score += 20
+        # Signal 1: Sender classified as spam
+        if classification.sender_type == SenderType.SPAM:
+            spam_score += 40
         
         # Signal 5: No direct recipient (bulk email)
         if not metadata.recipients or len(metadata.recipients) > 10:
             spam_score += 15
         
-        # Signal 6: Excessive links or promotional language
-        if text.count('http') > 5 or text.count('click here') > 2:
-            spam_score += 15
+        # Signals 2, 4, 6: subject/body content
+        if spam_score < SPAM_THRESHOLD:
+            spam_score += self._score_body(metadata.full_text_lower)
         
-        is_spam_email = spam_score >= 50
+        is_spam_email = spam_score >= SPAM_THRESHOLD
         
         if is_spam_email:
-            logger.info(f"✗ Marked as SPAM (score: {spam_score})")
+            logger.info("✗ Marked as SPAM (score: %d)", spam_score)
         else:
-            logger.debug(f"✓ Not spam (score: {spam_score})")
+            logger.debug("✓ Not spam (score: %d)", spam_score)
         
         return is_spam_email
     
+    def _score_body(self, text: str) -> int:
+        """Score the content signals of lowercased subject/body text"""
+        score = 0
+        counts = self._matcher.count(text)
+        
+        # Signal 2: Spam keywords in subject/body
+        spam_keyword_count = sum(1 for indicator in self._indicators_lc if indicator in counts)
+        score += min(spam_keyword_count * 10, 30)
+        
+        # Signal 4: Unsubscribe link present (marketing)
+        if 'unsubscribe' in counts:
+            score += 20
+        
+        # Signal 6: Excessive links or promotional language
+        if counts.get('http', 0) > 5 or counts.get('click here', 0) > 2:
+            score += 15
+        
+        return score
+    
     def mark_as_blocked(self, email_id: str):
         """
         S9: Mark as Blocked
@@ -2,12 +2,22 @@
 S3.5: Thread Summarization Module
 Generates short, factual summaries of email threads with decisions and open questions
 """
+import copy
+import hashlib
+import io
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import operator
+import re
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from config import Config
 from models import EmailMetadata
+from .keyword_matcher import KeywordMatcher
 
 # Gemini SDK
 try:
@@ -15,17 +25,193 @@ try:
 except ImportError:
     genai = None
 
+# Faster JSON (C parser/serializer) when orjson is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+if orjson is not None:
+    _json_loads, _json_dumps = orjson.loads, orjson.dumps
+else:
+    _json_loads, _json_dumps = json.loads, json.dumps
+
+# Expected summary JSON shape and rules shared by the Gemini prompts
+_SUMMARY_FORMAT = """{
+  "summary": "2-3 sentence overview of the thread",
+  "key_points": ["point 1", "point 2", "point 3"],
+  "decisions_made": ["decision 1", "decision 2"],
+  "open_questions": ["question 1", "question 2"],
+  "action_items": ["action 1", "action 2"],
+  "participants": ["name 1", "name 2"],
+  "sentiment": "positive" | "neutral" | "negative" | "urgent"
+}
+
+Rules:
+- Be factual and concise
+- Extract actual decisions (not speculation)
+- List only explicit open questions
+- Identify clear action items
+- Sentiment should reflect overall tone
+"""
+
+# Prompt templates. The fixed instructions come first and the thread text
+# last, so consecutive requests share a prefix Gemini can cache implicitly.
+_PROMPT_TMPL = (
+    "Analyze this email thread and provide a structured summary.\n\n"
+    "Return a JSON object with EXACTLY this structure (no markdown, no explanation):\n"
+    + _SUMMARY_FORMAT.replace("{", "{{").replace("}", "}}")
+    + "\nEmail thread:\n\n{context}"
+)
+_BATCH_PROMPT_PREFIX = (
+    "Analyze each of the email threads below and provide a structured summary for each.\n\n"
+    'Return a JSON object {"summaries": [...]} with one entry per thread, in the same '
+    "order as the threads (no markdown, no explanation). Each entry has EXACTLY this structure:\n"
+    + _SUMMARY_FORMAT
+)
+
+# Prompt combining the summaries of a long thread's chunks
+_REDUCE_PROMPT_PREFIX = (
+    "These are summaries of consecutive parts of one long email thread. "
+    "Combine them into a single summary of the whole thread.\n\n"
+    "Return a JSON object with EXACTLY this structure (no markdown, no explanation):\n"
+    + _SUMMARY_FORMAT
+    + "\nPart summaries:\n"
+)
+
+# Bookkeeping fields added to parsed summaries (not sent back to Gemini)
+_SUMMARY_META_KEYS = frozenset({'confidence', 'method', 'message_count', 'cache_hit'})
+
+# Long threads are summarized in windows of about this many tokens
+_CHUNK_TOKENS = 22500
+_CHUNK_OVERLAP_TOKENS = 250
+# Chunk summaries of one long thread requested concurrently
+_CHUNK_WORKERS = 4
+
+# Message timestamp format in prompts
+_DATE_FMT = '%Y-%m-%d %H:%M'
+
+# Threads packed into one prompt by summarize_threads_batch
+_BATCH_SIZE = 8
+
+# JSON object embedded in a Gemini response (possibly inside markdown)
+_JSON_RE = re.compile(r'\{[\s\S]*\}')
+
+# Rule-based extractor keywords, each fused into one alternation. No word
+# boundaries: these match substrings, like the `keyword in sentence` checks
+# they replace.
+_DECISION_RE = re.compile('|'.join(map(re.escape, (
+    'decided', 'agreed', 'approved', 'confirmed',
+    'will proceed', 'moving forward', 'have chosen',
+    'final decision', 'settled on'
+))))
+_ACTION_RE = re.compile('|'.join(map(re.escape, (
+    'please', 'need to', 'should', 'must', 'will',
+    'action item', 'todo', 'to do', 'follow up',
+    'next step'
+))))
+
+# A sentence is any run of text between periods (same pieces as
+# str.split('.'), minus the empty ones), yielded lazily
+_SENT_RE = re.compile(r'[^.]+')
+
+# Start of a sentence up to its first question mark
+_QUESTION_RE = re.compile(r'(?:^|\.)([^.?]*\?)')
+
+# Sentiment keyword groups, matched in a single scan
+_SENTIMENT_MATCHER = KeywordMatcher({
+    'urgent': ['urgent', 'asap', 'immediately', 'critical', 'emergency'],
+    'positive': ['thanks', 'great', 'excellent', 'perfect', 'appreciate'],
+    'negative': ['issue', 'problem', 'concern', 'disappointed', 'frustrated']
+})
+
+# Summary cache settings
+_CACHE_MAXSIZE = 512
+_CACHE_TTL_SECONDS = 4 * 60 * 60
+
+_BY_DATE = operator.attrgetter('date')
+
+
+def _sorted_by_date(messages: List[EmailMetadata]) -> List[EmailMetadata]:
+    """Return messages in date order, sorting only if they are not already"""
+    prev = None
+    for msg in messages:
+        if prev is not None and msg.date < prev:
+            return sorted(messages, key=_BY_DATE)
+        prev = msg.date
+    return messages
+
+
+def _estimate_tokens(msg: EmailMetadata) -> int:
+    """Rough prompt tokens for one message (~4 chars per token, body capped like the prompt)"""
+    body = msg.body_text or msg.snippet or ""
+    return (len(msg.sender) + len(msg.subject) + min(len(body), 500) + 60) // 4
+
+
+def _chunk_messages(messages: List[EmailMetadata], max_tokens: int = _CHUNK_TOKENS,
+                    overlap_tokens: int = _CHUNK_OVERLAP_TOKENS) -> List[List[EmailMetadata]]:
+    """
+    Split a thread into windows of at most max_tokens (estimated)
+    
+    Each window repeats the trailing messages of the previous one, up to
+    overlap_tokens, so context carries across chunk boundaries.
+    """
+    chunks = []
+    current: List[EmailMetadata] = []
+    current_tokens = 0
+    
+    for msg in messages:
+        tokens = _estimate_tokens(msg)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            
+            # Carry the tail of the previous window over as overlap
+            overlap: List[EmailMetadata] = []
+            overlap_size = 0
+            for prev in reversed(current):
+                prev_tokens = _estimate_tokens(prev)
+                if overlap_size + prev_tokens > overlap_tokens:
+                    break
+                overlap.insert(0, prev)
+                overlap_size += prev_tokens
+            current, current_tokens = overlap, overlap_size
+        
+        current.append(msg)
+        current_tokens += tokens
+    
+    if current or not chunks:
+        chunks.append(current)
+    return chunks
+
+
+def _union(lists) -> List[Any]:
+    """Concatenate lists, dropping duplicate (and non-string) items, order kept"""
+    return list(dict.fromkeys(
+        item for items in lists if items for item in items if isinstance(item, str)
+    ))
+
 
 class ThreadSummarizer:
     """Generates factual summaries of email threads"""
     
-    def __init__(self):
+    def __init__(self, cache_backend=None, client=None):
+        """
+        Args:
+            cache_backend: Optional shared cache (e.g. a redis or pymemcache
+                client) exposing get(key) and setex(key, ttl, value)
+            client: Optional genai.Client to share instead of creating one
+        """
         self.use_gemini = Config.GEMINI_ENABLED and bool(Config.GEMINI_API_KEY)
-        self.gemini_client = None
+        self.gemini_client = client
+        
+        # In-memory LRU of Gemini summaries, backed by the optional shared cache
+        self.cache_backend = cache_backend
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         
-        if self.use_gemini and genai:
+        if self.use_gemini and self.gemini_client is None and genai:
             try:
                 self.gemini_client = genai.Client(api_key=Config.GEMINI_API_KEY)
                 logger.info("✓ Thread Summarizer initialized with Gemini AI")
@@ -56,14 +242,22 @@ class ThreadSummarizer:
         logger.info(f"Summarizing thread with {len(messages)} message(s)")
         
         # Sort messages by date
-        sorted_messages = sorted(messages, key=lambda m: m.date)
+        sorted_messages = _sorted_by_date(messages)
         
         # Try Gemini AI first
         if self.use_gemini and self.gemini_client:
+            cache_key = self._cache_key(sorted_messages)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                logger.info("✓ Thread summary served from cache")
+                return cached
+            
             try:
                 summary_result = self._summarize_with_gemini(sorted_messages)
                 if summary_result:
                     logger.info("✓ Thread summarized with Gemini AI")
+                    summary_result['cache_hit'] = False
+                    self._cache_put(cache_key, summary_result)
                     return summary_result
             except Exception as e:
                 logger.error(f"Gemini summarization failed: {e}")
@@ -72,102 +266,256 @@ class ThreadSummarizer:
         logger.info("Using rule-based thread summarization")
         return self._summarize_with_rules(sorted_messages)
     
+    def summarize_threads_batch(self, threads: List[List[EmailMetadata]],
+                                batch_size: int = _BATCH_SIZE) -> List[Dict[str, Any]]:
+        """
+        Summarize many threads with one Gemini request per batch_size threads
+        
+        Cached and empty threads are resolved without a request. If a batch
+        response cannot be matched back to its threads, those threads fall
+        back to summarize_thread one by one.
+        """
+        if not (self.use_gemini and self.gemini_client):
+            return [self.summarize_thread(messages) for messages in threads]
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(threads)
+        pending = []
+        for i, messages in enumerate(threads):
+            if not messages:
+                results[i] = self._empty_summary()
+                continue
+            sorted_messages = _sorted_by_date(messages)
+            cache_key = self._cache_key(sorted_messages)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append((i, sorted_messages, cache_key))
+        
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            summaries = None
+            try:
+                response = self.gemini_client.models.generate_content(
+                    model=Config.GEMINI_MODEL,
+                    contents=self._build_batch_prompt([messages for _, messages, _ in chunk])
+                )
+                parsed = self._extract_json(response)
+                summaries = parsed.get('summaries') if parsed else None
+            except Exception as e:
+                logger.error(f"Gemini batch summarization error: {e}")
+            
+            if not isinstance(summaries, list) or len(summaries) != len(chunk):
+                logger.warning("Batch summary response unusable, summarizing threads individually")
+                for i, messages, _ in chunk:
+                    results[i] = self.summarize_thread(messages)
+                continue
+            
+            for (i, messages, cache_key), summary in zip(chunk, summaries):
+                if not isinstance(summary, dict):
+                    logger.warning(f"Batch summary entry {i} unusable, summarizing thread individually")
+                    results[i] = self.summarize_thread(messages)
+                    continue
+                summary['confidence'] = 0.9
+                summary['method'] = 'gemini_ai'
+                summary['message_count'] = len(messages)
+                summary['cache_hit'] = False
+                self._cache_put(cache_key, summary)
+                results[i] = summary
+        
+        logger.info(f"✓ Summarized {len(threads)} thread(s) in batches of {batch_size}")
+        return results
+    
+    def _cache_key(self, messages: List[EmailMetadata]) -> str:
+        """Content hash identifying a thread (message ids, dates and bodies)"""
+        digest = hashlib.sha256()
+        for msg in messages:
+            digest.update(msg.message_id.encode())
+            digest.update(b"\0")
+            digest.update(msg.date.isoformat().encode())
+            digest.update(b"\0")
+            digest.update((msg.body_text or "").encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached summary, in memory first, then the shared backend"""
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+        
+        if result is None and self.cache_backend is not None:
+            try:
+                raw = self.cache_backend.get(f"thread_summary:{key}")
+                if raw:
+                    result = _json_loads(raw)
+                    self._cache_put(key, result, write_backend=False)
+            except Exception as e:
+                logger.warning(f"Summary cache backend read failed: {e}")
+        
+        if result is None:
+            return None
+        # Deep copy: callers may mutate the summary's lists
+        result = copy.deepcopy(result)
+        result['cache_hit'] = True
+        return result
+    
+    def _cache_put(self, key: str, result: Dict[str, Any], write_backend: bool = True):
+        """Store a copy of a summary in the LRU (and the shared backend if configured)"""
+        stored = copy.deepcopy(result)
+        with self._cache_lock:
+            self._cache[key] = stored
+            self._cache.move_to_end(key)
+            if len(self._cache) > _CACHE_MAXSIZE:
+                self._cache.popitem(last=False)
+        
+        if write_backend and self.cache_backend is not None:
+            try:
+                self.cache_backend.setex(
+                    f"thread_summary:{key}", _CACHE_TTL_SECONDS, _json_dumps(result)
+                )
+            except Exception as e:
+                logger.warning(f"Summary cache backend write failed: {e}")
+    
     def _summarize_with_gemini(self, messages: List[EmailMetadata]) -> Optional[Dict[str, Any]]:
-        """Use Gemini AI to generate thread summary"""
+        """
+        Use Gemini AI to generate thread summary
+        
+        Threads too long for one prompt are summarized chunk by chunk, the
+        chunks concurrently, and the partial summaries are combined in a
+        final request.
+        """
         if not self.gemini_client:
             return None
         
-        # Build context for Gemini
-        context = self._build_thread_context(messages)
-        
-        prompt = f"""Analyze this email thread and provide a structured summary.
-
-{context}
-
-Return a JSON object with EXACTLY this structure (no markdown, no explanation):
-{{
-  "summary": "2-3 sentence overview of the thread",
-  "key_points": ["point 1", "point 2", "point 3"],
-  "decisions_made": ["decision 1", "decision 2"],
-  "open_questions": ["question 1", "question 2"],
-  "action_items": ["action 1", "action 2"],
-  "participants": ["name 1", "name 2"],
-  "sentiment": "positive" | "neutral" | "negative" | "urgent"
-}}
-
-Rules:
-- Be factual and concise
-- Extract actual decisions (not speculation)
-- List only explicit open questions
-- Identify clear action items
-- Sentiment should reflect overall tone
-"""
+        chunks = _chunk_messages(messages)
+        if len(chunks) == 1:
+            return self._generate_summary(self._build_prompt(messages), len(messages))
+        
+        logger.info(f"Summarizing long thread in {len(chunks)} chunks")
+        # Network-bound requests: threads overlap their round-trips
+        with ThreadPoolExecutor(max_workers=min(_CHUNK_WORKERS, len(chunks))) as pool:
+            partials = list(pool.map(
+                lambda chunk: self._generate_summary(self._build_prompt(chunk), len(chunk)), chunks
+            ))
+        partials = [p for p in partials if p]
+        if not partials:
+            return None
         
+        final = self._generate_summary(self._build_reduce_prompt(partials), len(messages))
+        return self._merge_partials(partials, final, len(messages))
+    
+    def _generate_summary(self, prompt: str, message_count: int) -> Optional[Dict[str, Any]]:
+        """Send one summary prompt to Gemini and parse the result"""
         try:
             response = self.gemini_client.models.generate_content(
                 model=Config.GEMINI_MODEL,
                 contents=prompt
             )
-            
-            raw_text = None
-            if hasattr(response, "text") and response.text:
-                raw_text = response.text
-            else:
-                try:
-                    raw_text = response.output[0].content[0].text
-                except Exception:
-                    raw_text = None
-            
-            if not raw_text:
-                return None
-            
-            # Parse JSON response
-            import json
-            import re
-            
-            # Extract JSON from potential markdown
-            json_match = re.search(r'\{[\s\S]*\}', raw_text)
-            if json_match:
-                json_str = json_match.group(0)
-                result = json.loads(json_str)
-                
-                # Add metadata
-                result['confidence'] = 0.9
-                result['method'] = 'gemini_ai'
-                result['message_count'] = len(messages)
-                
-                return result
-            
-            return None
+            return self._parse_gemini_response(response, message_count)
             
         except Exception as e:
             logger.error(f"Gemini thread summarization error: {e}")
             return None
     
+    def _build_reduce_prompt(self, partials: List[Dict[str, Any]]) -> str:
+        """Build the prompt combining chunk summaries into one thread summary"""
+        parts = [_REDUCE_PROMPT_PREFIX]
+        for i, partial in enumerate(partials, 1):
+            content = {k: v for k, v in partial.items() if k not in _SUMMARY_META_KEYS}
+            parts.append(f"Part {i}: {json.dumps(content, ensure_ascii=False)}")
+        return "\n".join(parts)
+    
+    def _merge_partials(self, partials: List[Dict[str, Any]], final: Optional[Dict[str, Any]],
+                        message_count: int) -> Dict[str, Any]:
+        """Combine chunk summaries, keeping every decision/question/action item once"""
+        if final is None:
+            final = {
+                'summary': " ".join(p.get('summary') or '' for p in partials).strip(),
+                'key_points': _union(p.get('key_points') for p in partials)[:5],
+                'sentiment': partials[-1].get('sentiment', 'neutral'),
+                'confidence': 0.9,
+                'method': 'gemini_ai'
+            }
+        
+        for field in ('decisions_made', 'open_questions', 'action_items', 'participants'):
+            final[field] = _union(p.get(field) for p in partials)
+        final['message_count'] = message_count
+        return final
+    
+    def _build_prompt(self, messages: List[EmailMetadata]) -> str:
+        """Build the Gemini summarization prompt for a thread"""
+        return _PROMPT_TMPL.format_map({'context': self._build_thread_context(messages)})
+    
+    def _build_batch_prompt(self, threads: List[List[EmailMetadata]]) -> str:
+        """Build one Gemini prompt covering several threads"""
+        # The budget covers the whole batch, not each thread
+        per_msg = self._per_message_budget(sum(len(messages) for messages in threads))
+        
+        parts = [_BATCH_PROMPT_PREFIX, f"There are {len(threads)} threads.\n"]
+        for i, messages in enumerate(threads, 1):
+            parts.append(f"=== Thread {i} ===")
+            parts.append(self._build_thread_context(messages, per_msg))
+        
+        return "\n".join(parts)
+    
+    def _parse_gemini_response(self, response, message_count: int) -> Optional[Dict[str, Any]]:
+        """Extract the summary JSON from a Gemini response"""
+        result = self._extract_json(response)
+        if result is None:
+            return None
+        
+        # Add metadata
+        result['confidence'] = 0.9
+        result['method'] = 'gemini_ai'
+        result['message_count'] = message_count
+        
+        return result
+    
+    def _extract_json(self, response) -> Optional[Dict[str, Any]]:
+        """Pull the JSON object out of a Gemini response's text"""
+        raw_text = None
+        if hasattr(response, "text") and response.text:
+            raw_text = response.text
+        else:
+            try:
+                raw_text = response.output[0].content[0].text
+            except Exception:
+                raw_text = None
+        
+        if not raw_text:
+            return None
+        
+        # Extract JSON from potential markdown
+        json_match = _JSON_RE.search(raw_text)
+        if json_match:
+            return _json_loads(json_match.group(0))
+        
+        return None
+    
     def _summarize_with_rules(self, messages: List[EmailMetadata]) -> Dict[str, Any]:
         """Rule-based thread summarization fallback"""
         
         # Extract key information
-        participants = set()
-        all_text = []
-        
+        # Appearances per participant, so the top 10 are the most active ones
+        participants = Counter()
         for msg in messages:
-            participants.add(msg.sender)
+            participants[msg.sender] += 1
             participants.update(msg.recipients)
-            all_text.append(msg.subject)
-            all_text.append(msg.body_text)
         
-        combined_text = " ".join(all_text).lower()
+        # Built in one join and lowercased once; shared by the extractors
+        # and the sentiment detector
+        combined_text = " ".join(
+            part for msg in messages for part in (msg.subject, msg.body_text)
+        ).lower()
         
-        # Detect decisions
-        decisions = self._extract_decisions(combined_text)
+        # Detect decisions and action items (one pass over the text)
+        decisions, action_items = self._extract_decisions_and_actions(combined_text)
         
         # Detect open questions
         open_questions = self._extract_questions(messages)
         
-        # Detect action items
-        action_items = self._extract_action_items(combined_text)
-        
         # Generate summary
         latest = messages[-1]
         subject = latest.subject
@@ -191,50 +539,68 @@ Rules:
             'decisions_made': decisions,
             'open_questions': open_questions,
             'action_items': action_items,
-            'participants': list(participants)[:10],  # Limit to 10
+            'participants': [name for name, _ in participants.most_common(10)],  # Limit to 10
             'sentiment': sentiment,
             'confidence': 0.7,
             'method': 'rule_based',
             'message_count': len(messages)
         }
     
-    def _build_thread_context(self, messages: List[EmailMetadata]) -> str:
-        """Build context string for Gemini"""
-        context_parts = []
+    def _build_thread_context(self, messages: List[EmailMetadata],
+                              per_msg: Optional[int] = None) -> str:
+        """
+        Build context string for Gemini
         
+        Each body is cut to per_msg characters; by default the prompt budget
+        is spread over the messages (between 200 and 500 chars each).
+        """
+        if per_msg is None:
+            per_msg = self._per_message_budget(len(messages))
+        
+        buf = io.StringIO()
+        write = buf.write
         for i, msg in enumerate(messages, 1):
-            context_parts.append(f"Message {i}:")
-            context_parts.append(f"From: {msg.sender}")
-            context_parts.append(f"Subject: {msg.subject}")
-            context_parts.append(f"Date: {msg.date.strftime('%Y-%m-%d %H:%M')}")
-            
+            write("Message ")
+            write(str(i))
+            write(":\nFrom: ")
+            write(msg.sender)
+            write("\nSubject: ")
+            write(msg.subject)
+            write("\nDate: ")
+            write(msg.date.strftime(_DATE_FMT))
+            write("\nContent: ")
             # Truncate body for token efficiency
-            body = msg.body_text[:500] if msg.body_text else msg.snippet
-            context_parts.append(f"Content: {body}")
-            context_parts.append("")
+            body = msg.body_text or msg.snippet or ""
+            if len(body) > per_msg:
+                body = body[:per_msg]
+            write(body)
+            write("\n\n")
         
-        return "\n".join(context_parts)
+        return buf.getvalue()[:-1]
     
-    def _extract_decisions(self, text: str) -> List[str]:
-        """Extract decisions from text"""
-        decision_keywords = [
-            'decided', 'agreed', 'approved', 'confirmed',
-            'will proceed', 'moving forward', 'have chosen',
-            'final decision', 'settled on'
-        ]
-        
+    @staticmethod
+    def _per_message_budget(message_count: int) -> int:
+        """Body characters allowed per message under Config.GEMINI_PROMPT_BUDGET"""
+        return max(200, min(500, Config.GEMINI_PROMPT_BUDGET // max(1, message_count)))
+    
+    def _extract_decisions_and_actions(self, text: str) -> Tuple[List[str], List[str]]:
+        """Extract decisions and action items from text in a single sentence walk"""
         decisions = []
-        sentences = text.split('.')
+        actions = []
         
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if any(keyword in sentence for keyword in decision_keywords):
-                if len(sentence) > 20 and len(sentence) < 200:
-                    decisions.append(sentence.capitalize())
-                    if len(decisions) >= 5:  # Limit to 5
-                        break
+        for match in _SENT_RE.finditer(text):
+            sentence = match.group(0).strip()
+            
+            if len(decisions) < 5 and 20 < len(sentence) < 200 and _DECISION_RE.search(sentence):
+                decisions.append(sentence.capitalize())
+            
+            if len(actions) < 5 and 15 < len(sentence) < 200 and _ACTION_RE.search(sentence):
+                actions.append(sentence.capitalize())
+            
+            if len(decisions) >= 5 and len(actions) >= 5:  # Limit to 5 each
+                break
         
-        return decisions
+        return decisions, actions
     
     def _extract_questions(self, messages: List[EmailMetadata]) -> List[str]:
         """Extract open questions from messages"""
@@ -244,48 +610,27 @@ Rules:
             text = f"{msg.subject} {msg.body_text}"
             
             # Find sentences with question marks
-            sentences = text.split('.')
-            for sentence in sentences:
-                if '?' in sentence:
-                    question = sentence.split('?')[0] + '?'
-                    question = question.strip()
-                    
-                    if len(question) > 10 and len(question) < 200:
-                        questions.append(question)
-                        if len(questions) >= 5:  # Limit to 5
-                            return questions
+            for match in _QUESTION_RE.finditer(text):
+                question = match.group(1).strip()
+                
+                if len(question) > 10 and len(question) < 200:
+                    questions.append(question)
+                    if len(questions) >= 5:  # Limit to 5
+                        return questions
         
         return questions
     
-    def _extract_action_items(self, text: str) -> List[str]:
-        """Extract action items from text"""
-        action_keywords = [
-            'please', 'need to', 'should', 'must', 'will',
-            'action item', 'todo', 'to do', 'follow up',
-            'next step'
-        ]
-        
-        actions = []
-        sentences = text.split('.')
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if any(keyword in sentence for keyword in action_keywords):
-                if len(sentence) > 15 and len(sentence) < 200:
-                    actions.append(sentence.capitalize())
-                    if len(actions) >= 5:  # Limit to 5
-                        break
-        
-        return actions
-    
     def _extract_key_points(self, messages: List[EmailMetadata]) -> List[str]:
         """Extract key discussion points"""
         key_points = []
+        seen = set()
         
         # Use subject lines as key points
         for msg in messages:
-            if msg.subject and msg.subject not in key_points:
-                key_points.append(msg.subject)
+            subject = msg.subject
+            if subject and subject not in seen:
+                seen.add(subject)
+                key_points.append(subject)
                 if len(key_points) >= 3:
                     break
         
@@ -293,15 +638,13 @@ Rules:
     
     def _detect_sentiment(self, text: str) -> str:
         """Detect overall sentiment of thread"""
-        urgent_keywords = ['urgent', 'asap', 'immediately', 'critical', 'emergency']
-        positive_keywords = ['thanks', 'great', 'excellent', 'perfect', 'appreciate']
-        negative_keywords = ['issue', 'problem', 'concern', 'disappointed', 'frustrated']
+        found = _SENTIMENT_MATCHER.find(text)
         
-        if any(keyword in text for keyword in urgent_keywords):
+        if found['urgent']:
             return 'urgent'
         
-        positive_count = sum(1 for keyword in positive_keywords if keyword in text)
-        negative_count = sum(1 for keyword in negative_keywords if keyword in text)
+        positive_count = len(found['positive'])
+        negative_count = len(found['negative'])
         
         if positive_count > negative_count:
             return 'positive'
@@ -5,10 +5,42 @@ Creates follow-up reminders and drafts
 import logging
 from datetime import datetime, timedelta
 from typing import List
-from models import FollowUp, EmailMetadata, IntentDetection
+from models import FollowUp, EmailMetadata, IntentDetection, IntentFlag
 
 logger = logging.getLogger(__name__)
 
+# Intents that call for a follow-up
+_FOLLOW_UP_INTENTS = IntentFlag.QUESTION | IntentFlag.REQUEST | IntentFlag.MEETING
+
+# Follow-up delays
+_TD1, _TD2, _TD3, _TD5 = (timedelta(days=d) for d in (1, 2, 3, 5))
+
+# Follow-up draft messages by intent
+_FU_TEMPLATES = {
+    'meeting': "Hi,\n\nI wanted to follow up on my previous email regarding scheduling a meeting. Have you had a chance to review your calendar?\n\nLooking forward to hearing from you.\n\nBest regards",
+    
+    'question': "Hi,\n\nI wanted to check in regarding my previous question. Please let me know if you need any clarification.\n\nThanks!",
+    
+    'request': "Hi,\n\nJust following up on my previous request. Please let me know if you have any updates.\n\nThank you!",
+    
+    'default': "Hi,\n\nI wanted to follow up on my previous email. Please let me know if you have any questions.\n\nBest regards"
+}
+
+# Template choice, checked in priority order
+_TEMPLATE_ORDER = (
+    (IntentFlag.MEETING, 'meeting'),
+    (IntentFlag.QUESTION, 'question'),
+    (IntentFlag.REQUEST, 'request'),
+)
+
+# Follow-up reasons, checked in priority order
+_REASONS = (
+    (IntentFlag.URGENT, "Urgent matter - follow up if no response"),
+    (IntentFlag.MEETING, "Meeting request pending - check availability"),
+    (IntentFlag.QUESTION, "Question asked - follow up if unanswered"),
+    (IntentFlag.REQUEST, "Request made - verify completion"),
+)
+
 
 class FollowUpGenerator:
     """Generates follow-up reminders"""
@@ -24,19 +56,22 @@ class FollowUpGenerator:
         
         follow_ups = []
         
+        # Intents as a bit mask, shared by the helpers below
+        mask = intent.intent_mask
+        
         # Determine if follow-up needed
-        if not self._needs_follow_up(intent):
+        if not self._needs_follow_up(mask):
             logger.debug("No follow-up needed")
             return follow_ups
         
         # Calculate follow-up date
-        suggested_date = self._calculate_follow_up_date(intent)
+        suggested_date = self._calculate_follow_up_date(datetime.now(), mask)
         
         # Generate reason
-        reason = self._generate_reason(intent)
+        reason = self._generate_reason(mask)
         
         # Generate draft message
-        draft_message = self._generate_follow_up_message(metadata, intent)
+        draft_message = self._generate_follow_up_message(metadata, mask)
         
         follow_up = FollowUp(
             email_id=metadata.message_id,
@@ -51,7 +86,7 @@ class FollowUpGenerator:
         logger.info(f"✓ Created follow-up for {suggested_date.strftime('%Y-%m-%d')}")
         return follow_ups
     
-    def _needs_follow_up(self, intent: IntentDetection) -> bool:
+    def _needs_follow_up(self, mask: IntentFlag) -> bool:
         """Determine if email needs follow-up"""
         # Follow-up needed for:
         # - Questions we asked
@@ -59,68 +94,36 @@ class FollowUpGenerator:
         # - Waiting for response
         # - Meeting scheduling
         
-        follow_up_intents = ['question', 'request', 'meeting']
-        
-        for intent_type in follow_up_intents:
-            if intent_type in intent.intents:
-                return True
-        
-        return False
+        return bool(mask & _FOLLOW_UP_INTENTS)
     
-    def _calculate_follow_up_date(self, intent: IntentDetection) -> datetime:
-        """Calculate appropriate follow-up date"""
-        now = datetime.now()
-        
+    def _calculate_follow_up_date(self, now: datetime, mask: IntentFlag) -> datetime:
+        """Calculate appropriate follow-up date relative to now"""
         # Urgent items: 1 day
-        if 'urgent' in intent.intents:
-            return now + timedelta(days=1)
+        if mask & IntentFlag.URGENT:
+            return now + _TD1
         
         # Meeting requests: 2 days
-        if 'meeting' in intent.intents:
-            return now + timedelta(days=2)
+        if mask & IntentFlag.MEETING:
+            return now + _TD2
         
         # Questions: 3 days
-        if 'question' in intent.intents:
-            return now + timedelta(days=3)
+        if mask & IntentFlag.QUESTION:
+            return now + _TD3
         
         # Default: 5 days
-        return now + timedelta(days=5)
+        return now + _TD5
     
-    def _generate_reason(self, intent: IntentDetection) -> str:
+    def _generate_reason(self, mask: IntentFlag) -> str:
         """Generate human-readable reason for follow-up"""
-        if 'urgent' in intent.intents:
-            return "Urgent matter - follow up if no response"
-        
-        if 'meeting' in intent.intents:
-            return "Meeting request pending - check availability"
-        
-        if 'question' in intent.intents:
-            return "Question asked - follow up if unanswered"
-        
-        if 'request' in intent.intents:
-            return "Request made - verify completion"
-        
-        return "Check status of this conversation"
+        return next(
+            (reason for flag, reason in _REASONS if mask & flag),
+            "Check status of this conversation"
+        )
     
     def _generate_follow_up_message(self, metadata: EmailMetadata,
-                                   intent: IntentDetection) -> str:
+                                   mask: IntentFlag) -> str:
         """Generate draft follow-up message"""
-        templates = {
-            'meeting': f"Hi,\n\nI wanted to follow up on my previous email regarding scheduling a meeting. Have you had a chance to review your calendar?\n\nLooking forward to hearing from you.\n\nBest regards",
-            
-            'question': f"Hi,\n\nI wanted to check in regarding my previous question. Please let me know if you need any clarification.\n\nThanks!",
-            
-            'request': f"Hi,\n\nJust following up on my previous request. Please let me know if you have any updates.\n\nThank you!",
-            
-            'default': f"Hi,\n\nI wanted to follow up on my previous email. Please let me know if you have any questions.\n\nBest regards"
-        }
-        
-        # Choose template
-        if 'meeting' in intent.intents:
-            return templates['meeting']
-        elif 'question' in intent.intents:
-            return templates['question']
-        elif 'request' in intent.intents:
-            return templates['request']
-        else:
-            return templates['default']
+        for flag, key in _TEMPLATE_ORDER:
+            if mask & flag:
+                return _FU_TEMPLATES[key]
+        return _FU_TEMPLATES['default']
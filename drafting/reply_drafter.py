@@ -5,7 +5,8 @@ Generates draft email replies using Gemini with Ollama fallback
 """
 
 import logging
-from typing import Optional
+import re
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 from LLM.llm_adapter import LLMAdapter
@@ -20,16 +21,23 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Emails drafted per batched Gemini request
+_DRAFT_BATCH_SIZE = 10
+
+# Section header separating replies in a batched Gemini response
+_REPLY_HEADER_RE = re.compile(r'^=== Reply (\d+) ===[ \t]*$', re.MULTILINE)
+
 
 class ReplyDrafter:
     """Generates draft email replies"""
 
-    def __init__(self):
+    def __init__(self, client=None):
+        """client: optional genai.Client to share instead of creating one"""
         self.use_gemini = Config.GEMINI_ENABLED and bool(Config.GEMINI_API_KEY) and genai is not None
         self.ollama = LLMAdapter(model="llama3.1:8b")
 
-        self.gemini_client = None
-        if self.use_gemini:
+        self.gemini_client = client
+        if self.use_gemini and self.gemini_client is None:
             try:
                 self.gemini_client = genai.Client(api_key=Config.GEMINI_API_KEY)
             except Exception as e:
@@ -78,6 +86,50 @@ class ReplyDrafter:
             logger.error("Draft generation failed completely")
             return None
 
+        draft = self._make_draft(metadata, draft_body, user_reply_text)
+        logger.info("✓ Draft reply generated")
+        return draft
+
+    def draft_replies_batch(
+        self,
+        items: List[Tuple[EmailMetadata, IntentDetection]]
+    ) -> List[Optional[DraftReply]]:
+        """
+        Draft replies for many emails with one Gemini request per batch
+
+        Only active with Config.GEMINI_DRAFT_BATCH; draft_reply itself does
+        not use Gemini. Returns drafts in the order of items, None for every
+        email the batch did not answer: draft those with draft_reply.
+        """
+        drafts: List[Optional[DraftReply]] = [None] * len(items)
+        if not (Config.GEMINI_DRAFT_BATCH and self.use_gemini and self.gemini_client):
+            return drafts
+
+        bodies: List[Optional[str]] = [None] * len(items)
+        for start in range(0, len(items), _DRAFT_BATCH_SIZE):
+            chunk = items[start:start + _DRAFT_BATCH_SIZE]
+            replies = self._generate_batch_with_gemini([
+                self._build_context(metadata, intent, getattr(intent, "user_supplied_text", None))
+                for metadata, intent in chunk
+            ])
+            bodies[start:start + len(chunk)] = replies
+
+        for i, ((metadata, intent), body) in enumerate(zip(items, bodies)):
+            if body:
+                drafts[i] = self._make_draft(
+                    metadata, body, getattr(intent, "user_supplied_text", None)
+                )
+
+        logger.info(f"✓ Batch drafted {sum(1 for d in drafts if d)} of {len(items)} replies")
+        return drafts
+
+    def _make_draft(
+        self,
+        metadata: EmailMetadata,
+        draft_body: str,
+        user_reply_text: Optional[str]
+    ) -> DraftReply:
+        """Wrap a generated body into a DraftReply with recipient/risk evidence"""
         subject = self._create_reply_subject(metadata.subject)
         
         # Detect reply-all risk (PRD requirement)
@@ -115,7 +167,6 @@ class ReplyDrafter:
             reply_all_risk=reply_all_risk
         )
 
-        logger.info("✓ Draft reply generated")
         return draft
 
     # --------------------------------------------------------------
@@ -144,6 +195,30 @@ class ReplyDrafter:
             logger.error(f"Gemini API error: {e}")
             return None
 
+    def _generate_batch_with_gemini(self, contexts: List[str]) -> List[Optional[str]]:
+        """Answer several drafting prompts in one Gemini request"""
+        sections = [
+            "Write one email reply for each numbered task below, following each "
+            "task's own instructions.\n"
+            "Answer with every reply under a header line '=== Reply N ===' "
+            "(N = task number), in order, and nothing else.\n"
+        ]
+        for i, context in enumerate(contexts, 1):
+            sections.append(f"### Task {i}\n{context}\n")
+
+        raw = self._generate_with_gemini("\n".join(sections))
+        replies: List[Optional[str]] = [None] * len(contexts)
+        if not raw:
+            return replies
+
+        # re.split with a capture group yields [preamble, n1, body1, n2, body2, ...]
+        parts = _REPLY_HEADER_RE.split(raw)
+        for number, body in zip(parts[1::2], parts[2::2]):
+            index = int(number) - 1
+            if 0 <= index < len(replies) and body.strip():
+                replies[index] = body.strip()
+        return replies
+
     # --------------------------------------------------------------
     # PROMPT BUILDER (FIXED)
     # --------------------------------------------------------------
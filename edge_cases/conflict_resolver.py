@@ -2,6 +2,7 @@
 E1-E2: Conflict resolution for multiple emails from same sender
 """
 import logging
+from collections import defaultdict
 from typing import List, Dict
 from datetime import datetime
 from models import ProcessedEmail
@@ -21,13 +22,10 @@ class ConflictResolver:
         """
         logger.info("Checking for multiple emails from same sender...")
         
-        sender_map: Dict[str, List[ProcessedEmail]] = {}
+        sender_map: Dict[str, List[ProcessedEmail]] = defaultdict(list)
         
         for email in emails:
-            sender = email.metadata.sender
-            if sender not in sender_map:
-                sender_map[sender] = []
-            sender_map[sender].append(email)
+            sender_map[email.metadata.sender].append(email)
         
         # Find senders with multiple emails
         conflicts = {
@@ -52,11 +50,9 @@ class ConflictResolver:
         if not emails:
             return None
         
-        # Sort by date (most recent first)
-        sorted_emails = sorted(emails, key=lambda e: e.metadata.date, reverse=True)
-        
-        latest = sorted_emails[0]
-        superseded = sorted_emails[1:]
+        # Most recent email (first one on ties, as a stable sort would pick)
+        latest = max(emails, key=lambda e: e.metadata.date)
+        superseded = [email for email in emails if email is not latest]
         
         # Mark older emails as superseded
         for email in superseded:
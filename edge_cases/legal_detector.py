@@ -2,9 +2,10 @@
 E3-E4: Legal and Finance content detection with escalation
 """
 import logging
-from typing import List
+from typing import Dict, List
 from config import Config
 from models import ProcessedEmail, SecurityFlag
+from core.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +13,9 @@ logger = logging.getLogger(__name__)
 class LegalFinanceDetector:
     """Detects legal/finance content requiring special handling"""
     
+    # Shared matcher for the keyword and phrase lists, built once per process
+    _matcher = None
+    
     def __init__(self):
         self.legal_keywords = Config.LEGAL_KEYWORDS
         self.finance_keywords = Config.FINANCE_KEYWORDS
@@ -29,6 +33,14 @@ class LegalFinanceDetector:
             'invoice attached', 'purchase order', 'payment due',
             'credit card', 'routing number'
         ]
+        
+        if LegalFinanceDetector._matcher is None:
+            LegalFinanceDetector._matcher = KeywordMatcher({
+                'legal': self.legal_keywords,
+                'critical_legal': self.critical_legal_phrases,
+                'finance': self.finance_keywords,
+                'critical_finance': self.critical_finance_phrases
+            })
     
     def check_legal_finance_content_urgent(self, email: ProcessedEmail) -> bool:
         """
@@ -38,13 +50,14 @@ class LegalFinanceDetector:
         """
         logger.debug(f"Checking legal/finance content for: {email.metadata.subject}")
         
-        text = f"{email.metadata.subject}\n{email.metadata.body_text}".lower()
+        # Legal and finance keywords and phrases (single scan)
+        found = self._matcher.find(email.metadata.full_text_lower)
         
         # Check for legal content
-        has_legal = self._check_legal_content(text)
+        has_legal = self._check_legal_content(found)
         
         # Check for finance content
-        has_finance = self._check_finance_content(text)
+        has_finance = self._check_finance_content(found)
         
         # Check if urgent
         is_urgent = email.priority and email.priority.score >= 70
@@ -92,24 +105,24 @@ class LegalFinanceDetector:
         logger.info("✓ Email escalated successfully")
         return email
     
-    def _check_legal_content(self, text: str) -> bool:
+    def _check_legal_content(self, found: Dict[str, List[str]]) -> bool:
         """Check for legal content"""
         # Check basic legal keywords
-        legal_count = sum(1 for keyword in self.legal_keywords if keyword in text)
+        legal_count = len(found['legal'])
         
         # Check critical legal phrases
-        critical_count = sum(1 for phrase in self.critical_legal_phrases if phrase in text)
+        critical_count = len(found['critical_legal'])
         
         # Legal content if multiple keywords or any critical phrase
         return legal_count >= 2 or critical_count >= 1
     
-    def _check_finance_content(self, text: str) -> bool:
+    def _check_finance_content(self, found: Dict[str, List[str]]) -> bool:
         """Check for financial content"""
         # Check basic finance keywords
-        finance_count = sum(1 for keyword in self.finance_keywords if keyword in text)
+        finance_count = len(found['finance'])
         
         # Check critical finance phrases
-        critical_count = sum(1 for phrase in self.critical_finance_phrases if phrase in text)
+        critical_count = len(found['critical_finance'])
         
         # Finance content if multiple keywords or any critical phrase
         return finance_count >= 2 or critical_count >= 1
@@ -2,8 +2,17 @@
 Main Email Agent Orchestrator
 Coordinates all components following the architecture diagram flow
 """
+import atexit
+import hashlib
 import logging
+import queue
+import re
+import traceback
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 import json
@@ -11,28 +20,105 @@ import json
 from config import Config
 from models import (
     ProcessedEmail, ProcessingBatch, EmailMetadata,
-    ProcessingStatus, EmailCategory
+    ProcessingStatus, EmailCategory, DraftReply
 )
 
 # Import all modules
 from prompt.prompt_interpreter import PromptInterpreter
-from tools import GmailClient, PermissionChecker
-from core import (
-    SenderClassifier, IntentDetector, PriorityScorer,
-    EmailCategorizer, SpamFilter, ThreadSummarizer
-)
-from drafting import ReplyDrafter, TonePreserver, FollowUpGenerator
-from edge_cases import ConflictResolver, LegalFinanceDetector, DNDHandler
-from guardrails import PIIDetector, DomainChecker, ToneEnforcer
-from output import QueueBuilder, MetricsGenerator
+from tools import get_gmail_client, PermissionChecker
 from logs.metrics_tracker import MetricsTracker
+# Pipeline modules (core, drafting, edge_cases, guardrails, output) are
+# imported on first use, see the component properties below
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Gemini SDK (optional)
+try:
+    from google import genai
+except ImportError:
+    genai = None
+
+# Faster JSON serializer (optional)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _configure_logging():
+    """
+    Root logging setup (as basicConfig would do it), with output moved off
+    the calling thread
+
+    Records go through a QueueHandler; a QueueListener thread formats and
+    writes them, so pipeline workers never block on the stream.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+    log_queue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    # Drain what is still queued on exit
+    atexit.register(listener.stop)
+
+
+_configure_logging()
 logger = logging.getLogger(__name__)
 
+# "Subject:" lines echoed by the LLM at the top of a composed body
+_SUBJECT_LINE_RE = re.compile(r'(?mi)^\s*Subject:.*\n')
+
+# Static compose instructions. They lead the prompt and the per-email fields
+# follow, so every compose call shares the same prefix (Gemini implicit
+# prefix caching); pass this block to the context-caching API if adopted.
+_COMPOSE_RULES = """Write a professional, concise email.
+
+Rules:
+- Write ONLY the email body (no subject line)
+- Be professional and friendly
+- Keep it concise (3-5 sentences)
+- End with a polite closing
+- Do not use placeholders like [Your Name]
+"""
+
+# Banner line around the stage logs
+_SEP = "=" * 60
+
+# Composed email bodies kept across runs, keyed by hash of (model, prompt)
+_DRAFT_CACHE_SIZE = 256
+
+
+def _norm_list(x) -> List[str]:
+    """Normalize recipients (comma string, list, or list of lists) to a flat list"""
+    if not x:
+        return []
+    if isinstance(x, str):
+        return [s for s in (s.strip() for s in x.split(",")) if s]
+    if isinstance(x, (list, tuple)):
+        return [
+            s
+            for item in x
+            for s in (item if isinstance(item, (list, tuple)) else (item,))
+            if s
+        ]
+    return [str(x)]
+
+
+def _dumps_indented(obj: Any) -> str:
+    """Pretty-print obj as JSON, via orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj, indent=2, default=str)
+
 
 class EmailAgent:
     """
@@ -41,42 +127,27 @@ class EmailAgent:
     """
     
     def __init__(self):
-        logger.info("="*60)
+        logger.info(_SEP)
         logger.info("Initializing Email Agent...")
-        logger.info("="*60)
-        self.prompt_interpreter = PromptInterpreter()
+        logger.info(_SEP)
+        
+        # One Gemini client (and HTTP session) shared by every component
+        self.gemini_client = self._create_gemini_client()
+        
+        self.prompt_interpreter = PromptInterpreter(client=self.gemini_client)
         self.action_plan = {}
 
         # S0: Start - Initialize all components
         self.gmail_client = None
         self.permission_checker = PermissionChecker()
         
-        # Core processing modules
-        self.classifier = SenderClassifier()
-        self.intent_detector = IntentDetector()
-        self.priority_scorer = PriorityScorer()
-        self.categorizer = EmailCategorizer()
-        self.spam_filter = SpamFilter()
-        self.thread_summarizer = ThreadSummarizer()
-        
-        # Drafting modules
-        self.reply_drafter = ReplyDrafter()
-        self.tone_preserver = TonePreserver()
-        self.followup_generator = FollowUpGenerator()
-        
-        # Edge case handlers
-        self.conflict_resolver = ConflictResolver()
-        self.legal_detector = LegalFinanceDetector()
-        self.dnd_handler = DNDHandler()
-        
-        # Guardrails
-        self.pii_detector = PIIDetector()
-        self.domain_checker = DomainChecker()
-        self.tone_enforcer = ToneEnforcer()
-        
-        # Output generators
-        self.queue_builder = QueueBuilder()
-        self.metrics_generator = MetricsGenerator()
+        # Saved drafts awaiting a user decision, by message id (see process_approvals)
+        self.pending_approvals: Dict[str, ProcessedEmail] = {}
+        
+        # Processing, drafting, edge case, guardrail and output components
+        # are built on first use (see the properties below), so the compose
+        # short-circuit does not pay for them
+        self._draft_cache: "OrderedDict[str, str]" = OrderedDict()
         
         # Metrics tracking
         self.metrics_tracker = MetricsTracker()
@@ -86,6 +157,116 @@ class EmailAgent:
         
         logger.info("✓ Email Agent initialized successfully")
     
+    # Core processing modules
+    
+    @cached_property
+    def classifier(self):
+        from core import SenderClassifier
+        return SenderClassifier()
+    
+    @cached_property
+    def intent_detector(self):
+        from core import IntentDetector
+        return IntentDetector()
+    
+    @cached_property
+    def priority_scorer(self):
+        from core import PriorityScorer
+        return PriorityScorer()
+    
+    @cached_property
+    def categorizer(self):
+        from core import EmailCategorizer
+        return EmailCategorizer()
+    
+    @cached_property
+    def spam_filter(self):
+        from core import SpamFilter
+        return SpamFilter()
+    
+    @cached_property
+    def thread_summarizer(self):
+        from core import ThreadSummarizer
+        return ThreadSummarizer(client=self.gemini_client)
+    
+    # Drafting modules
+    
+    @cached_property
+    def reply_drafter(self):
+        from drafting import ReplyDrafter
+        return ReplyDrafter(client=self.gemini_client)
+    
+    @cached_property
+    def tone_preserver(self):
+        from drafting import TonePreserver
+        return TonePreserver()
+    
+    @cached_property
+    def followup_generator(self):
+        from drafting import FollowUpGenerator
+        return FollowUpGenerator()
+    
+    # Edge case handlers
+    
+    @cached_property
+    def conflict_resolver(self):
+        from edge_cases import ConflictResolver
+        return ConflictResolver()
+    
+    @cached_property
+    def legal_detector(self):
+        from edge_cases import LegalFinanceDetector
+        return LegalFinanceDetector()
+    
+    @cached_property
+    def dnd_handler(self):
+        from edge_cases import DNDHandler
+        return DNDHandler()
+    
+    # Guardrails
+    
+    @cached_property
+    def pii_detector(self):
+        from guardrails import PIIDetector
+        return PIIDetector()
+    
+    @cached_property
+    def domain_checker(self):
+        from guardrails import DomainChecker
+        return DomainChecker()
+    
+    @cached_property
+    def tone_enforcer(self):
+        from guardrails import ToneEnforcer
+        return ToneEnforcer()
+    
+    @cached_property
+    def guardrail_pipeline(self):
+        from guardrails import GuardrailPipeline
+        return GuardrailPipeline(self.pii_detector, self.domain_checker, self.tone_enforcer)
+    
+    # Output generators
+    
+    @cached_property
+    def queue_builder(self):
+        from output import QueueBuilder
+        return QueueBuilder()
+    
+    @cached_property
+    def metrics_generator(self):
+        from output import MetricsGenerator
+        return MetricsGenerator()
+    
+    def _create_gemini_client(self):
+        """Create the shared Gemini client, or None when Gemini is unavailable"""
+        if not (Config.GEMINI_ENABLED and Config.GEMINI_API_KEY and genai):
+            return None
+        try:
+            return genai.Client(api_key=Config.GEMINI_API_KEY)
+        except Exception as e:
+            logger.error(f"Failed to initialize Gemini client: {e}")
+            return None
+    
     def run(self, user_prompt: str) -> Dict[str, Any]:
         """
         Main execution flow following the architecture diagram
@@ -98,10 +279,15 @@ class EmailAgent:
             Final response queue with metrics
         """
 
-        logger.info("="*60)
+        logger.info(_SEP)
         logger.info(f"STARTING EMAIL AGENT")
         logger.info(f"Command: {user_prompt}")
-        logger.info("="*60)
+        logger.info(_SEP)
+        
+        # The approval queue belongs to one run: drop undecided drafts
+        if self.pending_approvals:
+            logger.warning(f"Discarding {len(self.pending_approvals)} draft(s) left awaiting approval")
+            self.pending_approvals.clear()
         
         # S0: Interpret user prompt
         plan = self.prompt_interpreter.interpret(user_prompt)
@@ -246,9 +432,10 @@ class EmailAgent:
             sender_email = target.get("sender_email")
 
             if sender_email:
+                needle = sender_email.lower()
                 batch.emails = [
                     e for e in batch.emails
-                    if sender_email.lower() in e.metadata.sender.lower()
+                    if needle in e.metadata.sender.lower()
                 ]
 
                 if not batch.emails:
@@ -256,27 +443,49 @@ class EmailAgent:
                     return self.build_empty_response(batch)
 
                 if target.get("latest_only"):
-                    batch.emails = sorted(
-                        batch.emails,
-                        key=lambda e: e.metadata.date,
-                        reverse=True
-                    )[:1]
+                    # Single O(N) pass; first of equal dates wins, like the stable sort did
+                    batch.emails = [max(batch.emails, key=lambda e: e.metadata.date)]
 
-            # SECTION 3: Core Classification Pipeline
-            for email in emails:
-                self.process_email_core_pipeline(email)
+            # SECTION 3: Edge Case Handling, batch-level part (E1-E2). Needs
+            # only sender and date, so superseded emails skip the pipeline.
+            self.resolve_sender_conflicts(batch)
             
-            # SECTION 4: Edge Case Handling (parallel with core)
-            self.handle_edge_cases(batch)
+            # SECTION 4: Core Classification Pipeline, fused with the
+            # per-email edge case checks (E3-E9)
+            self.process_batch(batch.emails, edge_cases=True)
             
-            # SECTION 5: Drafting
-            for email in batch.emails:
-                if not email.is_blocked:
-                    self.draft_replies(email)
+            # SECTION 5: Drafting (replies generated on the worker pool, or in
+            # batched Gemini calls with GEMINI_DRAFT_BATCH, saved to Gmail in
+            # batched requests, then confirmed per email)
+            if self.action_plan.get("draft_replies", False):
+                candidates = [email for email in batch.emails if self._needs_draft(email)]
+            else:
+                candidates = []
+            if candidates:
+                drafts = self.reply_drafter.draft_replies_batch(
+                    [(email.metadata, email.intent) for email in candidates]
+                )
+                for email, draft in zip(candidates, drafts):
+                    email.draft_reply = draft
+                self._run_parallel(
+                    self._draft_reply, [email for email in candidates if not email.draft_reply]
+                )
+                candidates = [email for email in candidates if email.draft_reply]
+                self._save_drafts(candidates)
+                
+                # Drafts needing approval are queued instead of prompting,
+                # the rest go straight to the tone/timing and follow-up steps
+                ready = []
+                for email in candidates:
+                    if email.draft_reply.requires_approval:
+                        batch.pending_approvals.append(email)
+                        self._queue_for_approval(email)
+                    else:
+                        ready.append(email)
+                self._run_parallel(self._finish_draft, ready)
             
             # SECTION 6: Guardrails (Security checks)
-            for email in batch.emails:
-                self.apply_guardrails(email)
+            self._run_parallel(self.apply_guardrails, batch.emails)
             
             # SECTION 7: Final Output
             batch.completed_at = datetime.now()
@@ -284,9 +493,9 @@ class EmailAgent:
             
             response = self.generate_final_output(batch)
             
-            logger.info("="*60)
+            logger.info(_SEP)
             logger.info("✓ EMAIL AGENT COMPLETED SUCCESSFULLY")
-            logger.info("="*60)
+            logger.info(_SEP)
             
             return response
             
@@ -297,12 +506,13 @@ class EmailAgent:
     
     def check_tool_permissions(self):
         """T1-T6: Tool Scopes and Permissions Check"""
-        logger.info("\n" + "="*60)
+        logger.info("\n" + _SEP)
         logger.info("SECTION 1: Checking Tool Permissions")
-        logger.info("="*60)
+        logger.info(_SEP)
         
-        # Initialize Gmail client
-        self.gmail_client = GmailClient()
+        # Initialize Gmail client (shared, built once per process)
+        if not self.gmail_client:
+            self.gmail_client = get_gmail_client()
         
         # T1-T2: Check Required Tool Scopes
         has_permissions, missing_scopes = self.permission_checker.check_required_tool_scopes(
@@ -327,33 +537,45 @@ class EmailAgent:
     
     def data_ingestion(self, user_scope: Optional[Dict[str, Any]]) -> List[EmailMetadata]:
         """D1-D5: Data Ingestion Workflow"""
-        logger.info("\n" + "="*60)
+        logger.info("\n" + _SEP)
         logger.info("SECTION 2: Data Ingestion")
-        logger.info("="*60)
+        logger.info(_SEP)
         
         # Parse user scope
         query = user_scope.get('query', '') if user_scope else ''
         max_results = user_scope.get('max_results', Config.MAX_EMAILS_TO_PROCESS) if user_scope else Config.MAX_EMAILS_TO_PROCESS
         time_range = user_scope.get('time_range_days', 7) if user_scope else 7
         
-        # D1: Fetch Emails
-        messages = self.gmail_client.fetch_emails(
+        # D1: Fetch Emails, page by page; the next page is listed in the
+        # background while the current one is fetched and parsed
+        pages = self.gmail_client.fetch_email_pages(
             query=query,
             max_results=max_results,
             time_range_days=time_range
         )
         
-        # D2: Inbox Scan + D4: Metadata Extraction
         email_metadata_list = []
-        for msg in messages:
-            email_details = self.gmail_client.get_email_details(msg['id'])
-            if email_details:
-                metadata = self.gmail_client.extract_metadata(email_details)
-                email_metadata_list.append(metadata)
-        
-        # D3: Thread Mapping
-        message_ids = [msg['id'] for msg in messages]
-        thread_map = self.gmail_client.get_threads(message_ids)
+        thread_map = {}
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            next_page = prefetch.submit(next, pages, None)
+            while True:
+                messages = next_page.result()
+                if messages is None:
+                    break
+                next_page = prefetch.submit(next, pages, None)
+                
+                # D2: Inbox Scan (batched) + D4: Metadata Extraction
+                message_ids = [msg['id'] for msg in messages]
+                details = self.gmail_client.get_email_details_batch(message_ids)
+                for msg_id in message_ids:
+                    email_details = details.get(msg_id)
+                    if email_details:
+                        metadata = self.gmail_client.extract_metadata(email_details)
+                        email_metadata_list.append(metadata)
+                        
+                        # D3: Thread Mapping (from the fetched details, no extra requests)
+                        thread_map.setdefault(metadata.thread_id, []).append(metadata.message_id)
+        
         logger.info(f"Mapped into {len(thread_map)} thread(s)")
         
         # D5: Start Mode Note
@@ -369,138 +591,193 @@ class EmailAgent:
             received_at=metadata.date
         )
     
+    def process_batch(self, emails: List[ProcessedEmail], edge_cases: bool = False):
+        """
+        Run the core pipeline over a batch of emails
+        
+        Per-email stages run concurrently; priority scoring and the Gemini
+        thread summaries run once for the whole batch between them. With edge_cases, the per-email edge
+        case checks (E3-E9) run in the same pass as the final stage.
+        """
+        self._run_parallel(self._analyze_email, emails)
+        
+        priorities = self.priority_scorer.score_batch(
+            [(email.metadata, email.classification, email.intent) for email in emails]
+        )
+        for email, priority in zip(emails, priorities):
+            email.priority = priority
+        
+        self._prefetch_summaries(emails)
+        self._run_parallel(self._compile_pipeline(edge_cases), emails)
+    
+    def _prefetch_summaries(self, emails: List[ProcessedEmail]):
+        """
+        S3.5 for the whole batch, several emails per Gemini request
+        
+        The summaries land in the summarizer's cache, where each email's
+        summarize_single_email picks them up. Rule-based summaries are not
+        cached, so without Gemini there is nothing to prefetch.
+        """
+        summarizer = self.thread_summarizer
+        if not (summarizer.use_gemini and summarizer.gemini_client):
+            return
+        if self.action_plan.get("only_urgent"):
+            emails = [email for email in emails if email.priority.priority_level.name == "HIGH"]
+        try:
+            summarizer.summarize_threads_batch([[email.metadata] for email in emails])
+        except Exception as e:
+            logger.error(f"Batched thread summarization failed: {e}")
+    
+    def _compile_pipeline(self, edge_cases: bool = False):
+        """
+        Final per-email stage, specialized once per batch
+        
+        The action plan is fixed for the whole batch, so its switches are
+        resolved here and captured as locals instead of being looked up
+        for every email.
+        """
+        only_urgent = bool(self.action_plan.get("only_urgent"))
+        finish_email = self._finish_email
+        
+        if not edge_cases:
+            def stage(email: ProcessedEmail):
+                finish_email(email, only_urgent)
+            return stage
+        
+        check_edge_cases = self.check_email_edge_cases
+        
+        def stage(email: ProcessedEmail):
+            finish_email(email, only_urgent)
+            check_edge_cases(email)
+        return stage
+    
+    def _run_parallel(self, stage, emails: List[ProcessedEmail]):
+        """Apply a per-email stage to every email on the pipeline worker pool"""
+        workers = min(Config.PIPELINE_WORKERS, len(emails))
+        if workers <= 1:
+            for email in emails:
+                stage(email)
+            return
+        
+        # Threads rather than processes: the stages share this agent's
+        # clients, and the slow steps (Gemini, Gmail) are network-bound
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # list() re-raises the first stage exception, as the serial loop did
+            list(pool.map(stage, emails))
+    
     def process_email_core_pipeline(self, email: ProcessedEmail):
         """S1-S16: Core Classification Pipeline"""
+        self._analyze_email(email)
+        email.priority = self.priority_scorer.calculate_score(
+            email.metadata,
+            email.classification,
+            email.intent
+        )
+        self._finish_email(email)
+    
+    def _analyze_email(self, email: ProcessedEmail):
+        """S1-S2: Sender classification and intent detection"""
         email.status = ProcessingStatus.PROCESSING
-        if not hasattr(email, "processing_notes"):
-            email.processing_notes = []
+        metadata = email.metadata
+        note = email.processing_notes.append
 
         # S1: Sender Classification
-        email.classification = self.classifier.classify(email.metadata)
+        classification = email.classification = self.classifier.classify(metadata)
         # --- Explanation: classification notes ---
-        if not hasattr(email, "processing_notes"):
-            email.processing_notes = []
-
-        # Append classifier notes if present
-        if getattr(email.classification, "notes", None):
-            email.processing_notes.append(f"Classification notes: {email.classification.notes}")
-
-        # Append sender type / VIP
-        try:
-            email.processing_notes.append(
-                f"Sender type: {email.classification.sender_type.value}, VIP: {bool(email.classification.is_vip)}"
-            )
-        except Exception:
-            # defensive: some test objects may not have fields
-            pass
+        if classification.notes:
+            note(f"Classification notes: {classification.notes}")
+        note(f"Sender type: {classification.sender_type.value}, VIP: {bool(classification.is_vip)}")
 
         # S2: Keyword and Intent Detection
-        email.intent = self.intent_detector.detect(email.metadata)
+        intent = email.intent = self.intent_detector.detect(metadata)
         # --- Explanation: intent notes ---
-        if getattr(email, "intent", None):
-            if getattr(email.intent, "primary_intent", None):
-                email.processing_notes.append(f"Intent detected: {email.intent.primary_intent}")
-            # detected keywords
-            kws = getattr(email.intent, "keywords_detected", None)
-            if kws:
-                try:
-                    email.processing_notes.append(f"Keywords: {', '.join(kws)}")
-                except Exception:
-                    email.processing_notes.append(f"Keywords: {kws}")
-            # urgency keywords
-            urgency_kws = getattr(email.intent, "urgency_keywords", None)
-            if urgency_kws:
-                try:
-                    email.processing_notes.append(f"Urgency keywords: {', '.join(urgency_kws)}")
-                except Exception:
-                    email.processing_notes.append(f"Urgency keywords: {urgency_kws}")
-
-        # S3: Priority Scoring Engine
-        email.priority = self.priority_scorer.calculate_score(
-            email.metadata,
-            email.classification,
-            email.intent
-        )
-        # --- Explanation: priority notes ---
+        if intent.primary_intent:
+            note(f"Intent detected: {intent.primary_intent}")
+        if intent.keywords_detected:
+            note(f"Keywords: {', '.join(intent.keywords_detected)}")
+        if intent.urgency_keywords:
+            note(f"Urgency keywords: {', '.join(intent.urgency_keywords)}")
+    
+    def _finish_email(self, email: ProcessedEmail, only_urgent: Optional[bool] = None):
+        """
+        S3-S11: Everything after priority scoring (S3) for one email
         
-        if self.action_plan.get("only_urgent"):
-            if email.priority.priority_level.name != "HIGH":
+        only_urgent defaults to the action plan's setting.
+        """
+        metadata = email.metadata
+        classification = email.classification
+        intent = email.intent
+        priority = email.priority
+        note = email.processing_notes.append
+
+        # --- Explanation: priority notes (S3: Priority Scoring Engine) ---
+        
+        if only_urgent is None:
+            only_urgent = self.action_plan.get("only_urgent")
+        if only_urgent:
+            if priority.priority_level.name != "HIGH":
                 email.is_blocked = True
                 email.status = ProcessingStatus.SKIPPED
-                email.processing_notes.append("Skipped (only urgent requested)")
+                note("Skipped (only urgent requested)")
                 return
 
-        if getattr(email, "priority", None):
-            try:
-                score = email.priority.score
-            except Exception:
-                score = getattr(email.priority, "score", None) or 0
-            level = getattr(email.priority, "priority_level", None)
-            if level:
-                level_name = level.name if hasattr(level, "name") else str(level)
-            else:
-                level_name = "UNKNOWN"
-            email.processing_notes.append(f"Priority score: {score}/100 ({level_name})")
-            if getattr(email.priority, "reasoning", None):
-                email.processing_notes.append(f"Priority reasoning: {email.priority.reasoning}")
+        note(f"Priority score: {priority.score}/100 ({priority.priority_level.name})")
+        if priority.reasoning:
+            note(f"Priority reasoning: {priority.reasoning}")
 
         # S4: High Priority Decision + S5: Map to Important / Mark as NotReq
         # (handled automatically by priority_scorer)
         
         # S3.5: Thread Summarization (PRD Step 3)
         try:
-            email.thread_summary = self.thread_summarizer.summarize_single_email(email.metadata)
-            if email.thread_summary and email.thread_summary.get('summary'):
-                email.processing_notes.append(f"Thread summary: {email.thread_summary['summary'][:100]}")
-                if email.thread_summary.get('open_questions'):
-                    email.processing_notes.append(f"Open questions: {len(email.thread_summary['open_questions'])}")
+            summary = email.thread_summary = self.thread_summarizer.summarize_single_email(metadata)
+            if summary and summary.get('summary'):
+                note(f"Thread summary: {summary['summary'][:100]}")
+                if summary.get('open_questions'):
+                    note(f"Open questions: {len(summary['open_questions'])}")
         except Exception as e:
             logger.error(f"Thread summarization failed: {e}")
             email.thread_summary = None
         
         # S6-S7: Categorization
-        email.is_spam = self.spam_filter.is_spam(email.metadata, email.classification)
-        email.category = self.categorizer.categorize(
-            email.intent,
-            email.priority,
-            email.is_spam
+        is_spam = email.is_spam = self.spam_filter.is_spam(metadata, classification)
+        category = email.category = self.categorizer.categorize(
+            intent,
+            priority,
+            is_spam
         )
         # --- Explanation: category & spam notes ---
-        try:
-            email.processing_notes.append(f"Category assigned: {email.category.value}")
-        except Exception:
-            email.processing_notes.append(f"Category assigned: {email.category}")
-
-        if email.is_spam:
-            email.processing_notes.append("Marked as SPAM by spam filter")
-            # email.is_blocked already set later; leave that logic unchanged
+        note(f"Category assigned: {category.value}")
 
         # S8-S9: Spam Check
-        if email.is_spam:
-            self.spam_filter.mark_as_blocked(email.metadata.message_id)
+        if is_spam:
+            note("Marked as SPAM by spam filter")
+            self.spam_filter.mark_as_blocked(metadata.message_id)
             email.is_blocked = True
             email.status = ProcessingStatus.BLOCKED
             return
         
         # S11: Draft Reply Decision
         email.requires_reply = (
-            email.intent.action_required or
-            email.intent.question_detected or
-            email.category in [EmailCategory.ACTION]
+            intent.action_required or
+            intent.question_detected or
+            category is EmailCategory.ACTION
         )
         # --- Explanation: reply requirement ---
-        if email.requires_reply:
-            email.processing_notes.append("Marked as requiring a reply")
-        else:
-            email.processing_notes.append("No reply required")
+        note("Marked as requiring a reply" if email.requires_reply else "No reply required")
 
     def handle_edge_cases(self, batch: ProcessingBatch):
         """E1-E9: Edge Case Handling"""
-        logger.info("\n" + "="*60)
+        self.resolve_sender_conflicts(batch)
+        for email in batch.emails:
+            self.check_email_edge_cases(email)
+    
+    def resolve_sender_conflicts(self, batch: ProcessingBatch):
+        """E1-E2: Multiple emails from same sender (resolve + explain)"""
+        logger.info("\n" + _SEP)
         logger.info("SECTION 3: Edge Case Handling")
-        logger.info("="*60)
+        logger.info(_SEP)
 
-        # E1-E2: Multiple emails from same sender (resolve + explain)
         conflicts = self.conflict_resolver.check_multiple_from_same_sender(batch.emails)
         if conflicts:
             active_emails = self.conflict_resolver.resolve_conflicts(conflicts)
@@ -508,49 +785,51 @@ class EmailAgent:
             # Build a set of active message ids
             active_ids = {e.metadata.message_id for e in active_emails}
 
-            # Mark emails not in active_ids as superseded and append notes
+            # Mark conflicting emails not in active_ids as superseded and append notes
             for e in batch.emails:
-                if e.metadata.message_id not in active_ids:
+                if e.metadata.sender in conflicts and e.metadata.message_id not in active_ids:
                     # do not change blocking / core logic; only add explanation
-                    if not hasattr(e, "processing_notes"):
-                        e.processing_notes = []
                     e.processing_notes.append("Superseded by a newer email from the same sender")
 
             # Rebuild batch.emails: preserve emails from senders that had no conflict, plus the chosen active emails
             non_conflict_emails = [e for e in batch.emails if e.metadata.sender not in conflicts]
             batch.emails = non_conflict_emails + active_emails
             logger.info(f"Resolved sender conflicts; active emails count: {len(batch.emails)}")
-
+    
+    def check_email_edge_cases(self, email: ProcessedEmail):
+        """E3-E9: Per-email edge cases (legal/finance, tool alert, DND)"""
+        if email.is_blocked:
+            return
         
         # E3-E4: Legal/Finance Detection
-        for email in batch.emails:
-            if not email.is_blocked:
-                is_critical = self.legal_detector.check_legal_finance_content_urgent(email)
-                if is_critical:
-                    self.legal_detector.block_auto_reply_and_escalate(email)
+        if self.legal_detector.check_legal_finance_content_urgent(email):
+            self.legal_detector.block_auto_reply_and_escalate(email)
+            return
         
-        # E5-E9: DND Mode and Tool Alerts
-        can_send = self.operating_context.get('can_send', False)
+        # E5-E6: Tool Alert
+        has_alert, alert_reason = self.dnd_handler.check_tool_alert(
+            self.operating_context.get('can_send', False)
+        )
+        if has_alert:
+            self.dnd_handler.force_draft_only_and_warn(email, alert_reason)
         
-        for email in batch.emails:
-            if not email.is_blocked:
-                # E5-E6: Tool Alert
-                has_alert, alert_reason = self.dnd_handler.check_tool_alert(can_send)
-                if has_alert:
-                    self.dnd_handler.force_draft_only_and_warn(email, alert_reason)
-                
-                # E7-E9: DND Mode
-                if self.dnd_handler.check_external_email_to_dnd(email):
-                    dnd_decision = self.dnd_handler.handle_dnd_decision(email)
-                    logger.info(f"DND decision: {dnd_decision}")
+        # E7-E9: DND Mode
+        if self.dnd_handler.check_external_email_to_dnd(email):
+            dnd_decision = self.dnd_handler.handle_dnd_decision(email)
+            logger.info(f"DND decision: {dnd_decision}")
+    
+    def _needs_draft(self, email: ProcessedEmail) -> bool:
+        """
+        S11: Whether a reply should be drafted for this email
+
+        The action plan's draft_replies switch is checked once by the caller.
+        """
+        return not email.is_blocked and (email.requires_reply or self.force_reply is not False)
     
     def draft_replies(self, email: ProcessedEmail):
         """S11-S15: Drafting Pipeline"""
 
-        if (not email.requires_reply and self.force_reply is False) or email.is_blocked:
-            return
-
-        if not self.action_plan.get("draft_replies", False):
+        if not self._needs_draft(email):
             return
 
         # S12: Draft Reply (Gemini → template)
@@ -566,72 +845,118 @@ class EmailAgent:
 
         # 🔹 SAVE DRAFT TO GMAIL
         try:
-            # Take recipients/cc/bcc/subject/body from the DraftReply object
-            recipients = draft.recipients if isinstance(draft.recipients, (list, tuple)) else [draft.recipients]
-            cc = getattr(draft, "cc", []) or []
-            bcc = getattr(draft, "bcc", []) or []
-            subject = draft.subject
-            body = draft.body
-
-            # Defensive normalization (flatten lists)
-            def _norm_list(x):
-                if not x:
-                    return []
-                if isinstance(x, str):
-                    return [s.strip() for s in x.split(",") if s.strip()]
-                flat = []
-                for item in x:
-                    if isinstance(item, (list, tuple)):
-                        flat.extend(item)
-                    else:
-                        flat.append(item)
-                return flat
+            draft_id = self.gmail_client.create_draft(**self._draft_spec(draft))
+        except Exception as e:
+            logger.error(f"Failed to save Gmail draft: {e}")
+            return
 
-            recipients = _norm_list(recipients)
-            cc = _norm_list(cc)
-            bcc = _norm_list(bcc)
+        self._record_draft_id(draft, draft_id)
+        if draft.requires_approval:
+            self._queue_for_approval(email)
+        else:
+            self._finish_draft(email)
 
-            draft_id = self.gmail_client.create_draft(
-                to=recipients,
-                cc=cc,
-                bcc=bcc,
-                subject=subject,
-                body=body
-            )
+    def _draft_reply(self, email: ProcessedEmail):
+        """S12: Draft one reply (Ollama, then template) onto the email"""
+        email.draft_reply = self.reply_drafter.draft_reply(email.metadata, email.intent)
 
-            if draft_id:
-                draft.draft_id = draft_id
-                logger.info(f"✓ Draft saved to Gmail (draft_id={draft_id})")
-            else:
-                logger.warning("Draft generated but Gmail returned no draft id")
+    def _save_drafts(self, emails: List[ProcessedEmail]):
+        """
+        Save the drafted replies of emails to Gmail
+        
+        All drafts go out in batched requests. Drafts the batch certainly
+        did not create (rate-limited or not built) are retried as single
+        calls on the pipeline worker pool; the other failures may exist in
+        Gmail already, so they are reported instead of resubmitted.
+        """
+        drafts = [email.draft_reply for email in emails]
+        specs = [self._draft_spec(draft) for draft in drafts]
+        draft_ids, missing = self.gmail_client.create_drafts_batch(specs)
+        
+        resubmit = set(missing)
+        for i, draft_id in enumerate(draft_ids):
+            if not draft_id and i not in resubmit:
+                emails[i].processing_notes.append(
+                    "Draft not confirmed by Gmail (check Drafts before retrying)"
+                )
+                logger.error("Draft for %r not confirmed by Gmail; not resubmitted",
+                             emails[i].metadata.subject)
+        
+        if missing:
+            index = {id(emails[i]): i for i in missing}
+            retried: Dict[int, Optional[str]] = {}
+            
+            def _retry(email: ProcessedEmail):
+                i = index[id(email)]
+                retried[i] = self.gmail_client.create_draft(**specs[i])
+            
+            self._run_parallel(_retry, [emails[i] for i in missing])
+            for i in missing:
+                draft_ids[i] = retried.get(i)
+        
+        for draft, draft_id in zip(drafts, draft_ids):
+            self._record_draft_id(draft, draft_id)
 
-        except Exception as e:
-            logger.error(f"Failed to save Gmail draft: {e}")
-            return
+    def _draft_spec(self, draft: DraftReply) -> Dict[str, Any]:
+        """create_draft arguments for a DraftReply"""
+        # Take recipients/cc/bcc/subject/body from the DraftReply object
+        return {
+            "to": _norm_list(draft.recipients),
+            "cc": _norm_list(draft.cc),
+            "bcc": _norm_list(draft.bcc),
+            "subject": draft.subject,
+            "body": draft.body
+        }
 
+    def _record_draft_id(self, draft: DraftReply, draft_id: Optional[str]):
+        """Attach the Gmail draft id returned by create_draft"""
+        if draft_id:
+            draft.draft_id = draft_id
+            logger.info("✓ Draft saved to Gmail (draft_id=%s)", draft_id)
+        else:
+            logger.warning("Draft generated but Gmail returned no draft id")
 
-        # --------------------------------------------------
-        # 🧠 HUMAN CONFIRMATION (THIS IS WHERE IT GOES)
-        # --------------------------------------------------
-        if email.draft_reply.requires_approval:
-            print("\n📧 Draft Reply:")
-            print("-" * 40)
-            print(email.draft_reply.body)
-            print("-" * 40)
+    def _queue_for_approval(self, email: ProcessedEmail):
+        """S13: Hold a saved draft until process_approvals gets a decision"""
+        self.pending_approvals[email.metadata.message_id] = email
+        email.processing_notes.append("Draft awaiting user approval")
+        logger.info("Draft queued for approval: %s", email.metadata.subject)
+
+    def process_approvals(self, decisions: Dict[str, bool]) -> List[ProcessedEmail]:
+        """
+        S13: Apply user decisions to queued drafts
 
-            confirm = input("Send this email? (yes/no): ").strip().lower()
+        Args:
+            decisions: Approve (True) or decline (False) per message id
 
-            if confirm != "yes":
+        Returns:
+            The approved emails
+        """
+        approved = []
+        for message_id, approve in decisions.items():
+            email = self.pending_approvals.pop(message_id, None)
+            if email is None:
+                logger.warning(f"No draft awaiting approval for message {message_id}")
+                continue
+
+            if not approve:
                 email.processing_notes.append("User declined to send draft")
                 logger.info("User declined to send the draft")
-                return
+                continue
 
             logger.info("User approved draft for sending")
 
             # ⚠️ NOTE: actual send logic can go here later
 
+            self._finish_draft(email)
+            approved.append(email)
+
+        return approved
+
+    def _finish_draft(self, email: ProcessedEmail):
+        """S14-S15: Tone/timing check and follow-ups for an approved draft"""
         # S14: Tone and Timing Check
-        should_delay = self.tone_preserver.preserves_tone_or_reply_after_hour(draft)
+        should_delay = self.tone_preserver.preserves_tone_or_reply_after_hour(email.draft_reply)
 
         # S15: Follow-ups
         if should_delay and self.action_plan.get("include_followups"):
@@ -643,47 +968,36 @@ class EmailAgent:
     
     def apply_guardrails(self, email: ProcessedEmail):
         """G1-G7: Guardrails and Security"""
-        logger.debug(f"Applying guardrails to: {email.metadata.subject}")
+        logger.debug("Applying guardrails to: %s", email.metadata.subject)
+        
+        # G1-G4 over one shared scan of the email and draft
+        result = self.guardrail_pipeline.process(email)
+        has_pii, pii_types = result.has_pii, result.pii_types
         
-        # G1: PII Detection
-        has_pii, pii_types = self.pii_detector.detect_pii_and_confidential(email)
         # --- Explanation: PII detection notes ---
         if self.action_plan.get("require_approval") and email.draft_reply:
             email.draft_reply.requires_approval = True
 
         if has_pii:
             email.has_pii = True
-            if not hasattr(email, "processing_notes"):
-                email.processing_notes = []
             if pii_types:
                 email.processing_notes.append(f"PII detected: {', '.join(pii_types)}")
             else:
                 email.processing_notes.append("PII detected (types not identified)")
 
-        # G2: Domain Restriction Check
-        domain_approved = self.domain_checker.check_domain_restrictions(email)
         # --- Explanation: domain restriction notes ---
-        if not domain_approved:
-            if not hasattr(email, "processing_notes"):
-                email.processing_notes = []
+        if not result.domain_approved:
             email.processing_notes.append("Domain restriction: external domain not approved for automatic action")
 
-        # G3: Safe Tone Enforcement
-        if email.draft_reply:
-            tone_approved, tone_issues = self.tone_enforcer.enforce_safe_tone(email)
-        else:
-            tone_approved = True
         # --- Explanation: tone enforcement notes ---
-        if not tone_approved:
-            if not hasattr(email, "processing_notes"):
-                email.processing_notes = []
-            if tone_issues:
-                email.processing_notes.append(f"Tone issues found: {', '.join(tone_issues)}")
+        if not result.tone_approved:
+            if result.tone_issues:
+                email.processing_notes.append(f"Tone issues found: {', '.join(result.tone_issues)}")
             else:
                 email.processing_notes.append("Tone enforcement flagged the draft")
 
         # G4: External Email or High Risk?
-        is_external = self.domain_checker.is_external_email(email)
+        is_external = result.is_external
         has_security_flags = len(email.security_flags) > 0
         
         if is_external or has_security_flags:
@@ -691,7 +1005,7 @@ class EmailAgent:
             email.status = ProcessingStatus.APPROVAL_REQUIRED
             if email.draft_reply:
                 email.draft_reply.requires_approval = True
-            logger.info(f"⚠️ Approval required for: {email.metadata.subject}")
+            logger.info("⚠️ Approval required for: %s", email.metadata.subject)
             email.processing_notes.append("Approval required due to external sender or high-risk security flags")
         else:
             # G6: Draft Marked Ready
@@ -704,9 +1018,9 @@ class EmailAgent:
 
     def generate_final_output(self, batch: ProcessingBatch) -> Dict[str, Any]:
         """F1-F2: Final Output Generation"""
-        logger.info("\n" + "="*60)
+        logger.info("\n" + _SEP)
         logger.info("SECTION 4: Generating Final Output")
-        logger.info("="*60)
+        logger.info(_SEP)
         
         # F1: Build Final Response Queue
         queue = self.queue_builder.build_final_queue(batch)
@@ -718,7 +1032,7 @@ class EmailAgent:
         print("\n" + metrics_display)
         
         print("\nTOP 10 IMPORTANT EMAILS (with reasons):")
-        print(json.dumps(queue.get("top_10_emails", []), indent=2, default=str))
+        print(_dumps_indented(queue.get("top_10_emails", [])))
 
         # Combine into final response
         response = {
@@ -729,7 +1043,10 @@ class EmailAgent:
                 "started_at": batch.started_at.isoformat(),
                 "completed_at": batch.completed_at.isoformat() if batch.completed_at else None,
                 "command": batch.user_command
-            }
+            },
+            "pending_approvals": [
+                email.metadata.message_id for email in batch.pending_approvals
+            ]
         }
         
         return response
@@ -767,41 +1084,24 @@ class EmailAgent:
         
         # Ensure client is initialized
         if not self.gmail_client:
-            from tools import GmailClient
-            self.gmail_client = GmailClient()
+            self.gmail_client = get_gmail_client()
         
         logger.info(f"Composing new email to {recipients} with intent: {intent}")
         
         # Use Gemini AI to generate email body
         body = None
         try:
-            from google import genai
-            gemini_client = genai.Client(api_key=Config.GEMINI_API_KEY)
+            gemini_client = self.gemini_client or genai.Client(api_key=Config.GEMINI_API_KEY)
             
-            prompt = f"""Write a professional, concise email.
-
-Recipient: {recipients[0] if recipients else 'recipient'}
-Subject: {subject}
-Purpose: {intent}
-
-Rules:
-- Write ONLY the email body (no subject line)
-- Be professional and friendly
-- Keep it concise (3-5 sentences)
-- End with a polite closing
-- Do not use placeholders like [Your Name]
-"""
-            
-            response = gemini_client.models.generate_content(
-                model=Config.GEMINI_MODEL,
-                contents=prompt
+            prompt = _COMPOSE_RULES + (
+                f"\nRecipient: {recipients[0] if recipients else 'recipient'}\n"
+                f"Subject: {subject}\n"
+                f"Purpose: {intent}\n"
             )
             
-            if hasattr(response, "text") and response.text:
-                body = response.text.strip()
+            body = self._cached_generate(gemini_client, prompt)
+            if body:
                 logger.info("✓ Email body generated with Gemini AI")
-            else:
-                body = None
         except Exception as e:
             logger.warning(f"Gemini compose failed: {e}")
             body = None
@@ -828,25 +1128,9 @@ Looking forward to hearing from you.
 Best regards"""
 
         # Sanitize LLM output: remove any leading "Subject:" line(s)
-        import re
-        body = re.sub(r'(?mi)^\s*Subject:.*\n', '', body).strip()
+        body = _SUBJECT_LINE_RE.sub('', body).strip()
 
         # Defensive normalization — ensure lists
-        def _norm_list(x):
-            if not x:
-                return []
-            if isinstance(x, str):
-                return [s.strip() for s in x.split(",") if s.strip()]
-            if isinstance(x, (list, tuple)):
-                flat = []
-                for item in x:
-                    if isinstance(item, (list, tuple)):
-                        flat.extend(item)
-                    else:
-                        flat.append(item)
-                return [s for s in flat if s]
-            return [str(x)]
-
         cc = _norm_list(cc)
         bcc = _norm_list(bcc)
         recipients = _norm_list(recipients)
@@ -865,7 +1149,6 @@ Best regards"""
             draft_id = None
         
         if draft_id:
-            from models import DraftReply
             draft = DraftReply(
                 draft_id=draft_id,
                 subject=subject,
@@ -880,7 +1163,6 @@ Best regards"""
         else:
             # Even if draft creation fails, return a DraftReply object
             # so the GUI can display it (just without a draft_id)
-            from models import DraftReply
             logger.warning("Draft creation failed, returning draft object without Gmail draft_id")
             draft = DraftReply(
                 draft_id="local_draft",
@@ -893,39 +1175,69 @@ Best regards"""
             )
             return draft
 
+    def _cached_generate(self, gemini_client, prompt: str) -> Optional[str]:
+        """
+        Gemini compose-model text for prompt, cached by (model, prompt)
+        
+        Identical compose requests (re-runs, retries) reuse the earlier
+        body instead of another LLM round-trip. Only successful responses
+        are cached.
+        """
+        model = Config.GEMINI_COMPOSE_MODEL
+        key = hashlib.sha256(f"{model}\0{prompt}".encode()).hexdigest()
+        body = self._draft_cache.get(key)
+        if body is not None:
+            self._draft_cache.move_to_end(key)
+            logger.info("✓ Email body served from cache")
+            return body
+        
+        response = gemini_client.models.generate_content(
+            model=model,
+            contents=prompt
+        )
+        if not (hasattr(response, "text") and response.text):
+            return None
+        
+        body = response.text.strip()
+        self._draft_cache[key] = body
+        if len(self._draft_cache) > _DRAFT_CACHE_SIZE:
+            self._draft_cache.popitem(last=False)
+        return body
+
     def send_draft(self, draft_id: str) -> bool:
         """Send a draft by ID"""
-        logger.info("="*60)
-        logger.info("📤 EMAIL_AGENT.send_draft() called")
-        logger.info(f"   Draft ID: {draft_id}")
-        logger.info(f"   Draft ID type: {type(draft_id)}")
-        logger.info(f"   Gmail client exists: {self.gmail_client is not None}")
+        verbose = logger.isEnabledFor(logging.INFO)
+        if verbose:
+            logger.info(_SEP)
+            logger.info("📤 EMAIL_AGENT.send_draft() called")
+            logger.info("   Draft ID: %s", draft_id)
+            logger.info("   Draft ID type: %s", type(draft_id))
+            logger.info("   Gmail client exists: %s", self.gmail_client is not None)
         
         if not self.gmail_client:
             logger.info("   Creating new Gmail client...")
-            from tools import GmailClient
-            self.gmail_client = GmailClient()
+            self.gmail_client = get_gmail_client()
             logger.info("   ✓ Gmail client created")
         
-        logger.info(f"   Calling gmail_client.send_email(draft_id='{draft_id}')...")
+        logger.info("   Calling gmail_client.send_email(draft_id='%s')...", draft_id)
         try:
             result = self.gmail_client.send_email(draft_id=draft_id)
-            logger.info(f"   Gmail API returned: {result} (type: {type(result)})")
+            if verbose:
+                logger.info("   Gmail API returned: %s (type: %s)", result, type(result))
             
             if result:
-                logger.info(f"✅ Successfully sent draft {draft_id}")
-                logger.info("="*60)
+                logger.info("✅ Successfully sent draft %s", draft_id)
+                logger.info(_SEP)
             else:
-                logger.error(f"❌ Failed to send draft {draft_id}")
+                logger.error("❌ Failed to send draft %s", draft_id)
                 logger.error("   Gmail API returned False/None")
-                logger.info("="*60)
+                logger.info(_SEP)
             return result
         except Exception as e:
-            logger.error(f"❌ Exception in send_draft: {e}")
-            logger.error(f"   Exception type: {type(e).__name__}")
-            import traceback
+            logger.error("❌ Exception in send_draft: %s", e)
+            logger.error("   Exception type: %s", type(e).__name__)
             logger.error(traceback.format_exc())
-            logger.info("="*60)
+            logger.info(_SEP)
             return False
 
 
@@ -961,6 +1273,19 @@ def main():
     user_prompt = input("\n🧠 What would you like me to do with your inbox?\n> ")
     # user_command= user_prompt
     result = agent.run(user_prompt)
+    
+    # 🧠 HUMAN CONFIRMATION for the drafts queued during the run
+    decisions = {}
+    for message_id, email in list(agent.pending_approvals.items()):
+        print("\n📧 Draft Reply:")
+        print("-" * 40)
+        print(email.draft_reply.body)
+        print("-" * 40)
+        
+        confirm = input("Send this email? (yes/no): ").strip().lower()
+        decisions[message_id] = confirm == "yes"
+    if decisions:
+        agent.process_approvals(decisions)
 
     # Run agent
     # result = agent.run(user_command, user_scope)
@@ -4,5 +4,10 @@ Guardrails and security modules
 from .pii_detector import PIIDetector
 from .domain_checker import DomainChecker
 from .tone_enforcer import ToneEnforcer
+from .scanner import GuardrailScan
+from .pipeline import GuardrailPipeline, GuardrailResult
 
-__all__ = ['PIIDetector', 'DomainChecker', 'ToneEnforcer']
+__all__ = [
+    'PIIDetector', 'DomainChecker', 'ToneEnforcer', 'GuardrailScan',
+    'GuardrailPipeline', 'GuardrailResult'
+]
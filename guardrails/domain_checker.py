@@ -2,22 +2,29 @@
 G2: Domain Restriction Check
 """
 import logging
-from typing import List
+import re
+from typing import List, Optional
 from config import Config
 from models import ProcessedEmail, SecurityFlag
+from .scanner import GuardrailScan
 
 logger = logging.getLogger(__name__)
 
+_DOMAIN_RE = re.compile(r'@([\w\.-]+)')
+
 
 class DomainChecker:
     """Checks email domains against allowed/blocked lists"""
     
     def __init__(self):
-        self.allowed_domains = Config.ALLOWED_DOMAINS
-        self.blocked_domains = Config.BLOCKED_DOMAINS
+        # Own lowercased copies: extracted domains are lowercase, and
+        # add_allowed_domain/add_blocked_domain must not mutate Config
+        self.allowed_domains = {d.lower() for d in Config.ALLOWED_DOMAINS}
+        self.blocked_domains = {d.lower() for d in Config.BLOCKED_DOMAINS}
         self.internal_domains = set()  # Add company internal domains
     
-    def check_domain_restrictions(self, email: ProcessedEmail) -> bool:
+    def check_domain_restrictions(self, email: ProcessedEmail,
+                                  scan: Optional[GuardrailScan] = None) -> bool:
         """
         G2: Domain Restriction Check
         
@@ -31,18 +38,12 @@ class DomainChecker:
         if not email.draft_reply:
             return True
         
-        # Get all recipients
-        all_recipients = (
-            email.draft_reply.recipients +
-            email.draft_reply.cc
-        )
+        # Extract domains (To + Cc)
+        recipient_domains = self._recipient_domains(email, scan)
         
-        if not all_recipients:
+        if not recipient_domains:
             return True
         
-        # Extract domains
-        recipient_domains = [self._extract_domain(r) for r in all_recipients]
-        
         # Check each domain
         violations = []
         
@@ -85,19 +86,32 @@ class DomainChecker:
     
     def _extract_domain(self, email_address: str) -> str:
         """Extract domain from email address"""
-        import re
-        match = re.search(r'@([\w\.-]+)', email_address)
+        match = _DOMAIN_RE.search(email_address)
         return match.group(1).lower() if match else ""
     
-    def is_external_email(self, email: ProcessedEmail) -> bool:
+    def _recipient_domains(self, email: ProcessedEmail,
+                           scan: Optional[GuardrailScan] = None) -> List[str]:
+        """Distinct domains of the draft's To and Cc recipients, kept on scan for reuse"""
+        if scan is not None and scan.recipient_domains is not None:
+            return scan.recipient_domains
+        
+        draft = email.draft_reply
+        # Same domain across To/Cc (or a repeated address) is checked and
+        # reported once; dict keeps first-seen order for the flag details
+        domains = list(dict.fromkeys(
+            self._extract_domain(r) for r in draft.recipients + draft.cc if r
+        ))
+        if scan is not None:
+            scan.recipient_domains = domains
+        return domains
+    
+    def is_external_email(self, email: ProcessedEmail,
+                          scan: Optional[GuardrailScan] = None) -> bool:
         """Check if email is going to external recipients"""
         if not email.draft_reply:
             return False
         
-        recipients = email.draft_reply.recipients + email.draft_reply.cc
-        
-        for recipient in recipients:
-            domain = self._extract_domain(recipient)
+        for domain in self._recipient_domains(email, scan):
             if domain not in self.allowed_domains and domain not in self.internal_domains:
                 return True
         
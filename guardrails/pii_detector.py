@@ -3,26 +3,57 @@ G1: PII and Confidential Data Detection
 """
 import logging
 import re
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from models import ProcessedEmail, SecurityFlag
+from core.keyword_matcher import KeywordMatcher
+from .scanner import GuardrailScan
+
+try:
+    import re2
+except ImportError:
+    re2 = None
 
 logger = logging.getLogger(__name__)
 
+# PII patterns, compiled once. Uses the RE2 (DFA) engine when google-re2 is
+# installed; none of these need backtracking features.
+_PII_SOURCES = {
+    'ssn': r'\b\d{3}-\d{2}-\d{4}\b',
+    'credit_card': r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b',
+    'phone': r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
+    'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    'ip_address': r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b',
+    'api_key': r'\b[A-Za-z0-9]{32,}\b',
+    'password': r'(?i:password|passwd|pwd)[\s:=]+[^\s]+',
+}
+_PII_PATTERNS = {
+    name: (re2 or re).compile(pattern) for name, pattern in _PII_SOURCES.items()
+}
+
+# All patterns as one alternation. A single pass tells whether a text has any
+# PII at all; the per-type scans only run on texts where it matches.
+_PII_ANY = (re2 or re).compile(
+    '|'.join(f'(?:{pattern})' for pattern in _PII_SOURCES.values())
+)
+
+# Redactions applied by anonymize_text, in order
+_ANONYMIZE_RULES = (
+    (_PII_PATTERNS['ssn'], 'XXX-XX-XXXX'),
+    (_PII_PATTERNS['credit_card'], 'XXXX-XXXX-XXXX-XXXX'),
+    (_PII_PATTERNS['phone'], 'XXX-XXX-XXXX'),
+    (_PII_PATTERNS['api_key'], '[REDACTED_API_KEY]'),
+)
+
 
 class PIIDetector:
     """Detects Personally Identifiable Information and confidential data"""
     
+    # Shared matcher for the confidential markers, built once per process
+    _matcher = None
+    
     def __init__(self):
-        # Regex patterns for PII
-        self.patterns = {
-            'ssn': r'\b\d{3}-\d{2}-\d{4}\b',
-            'credit_card': r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b',
-            'phone': r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
-            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'ip_address': r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b',
-            'api_key': r'\b[A-Za-z0-9]{32,}\b',
-            'password': r'(?i)(password|passwd|pwd)[\s:=]+[^\s]+',
-        }
+        # Compiled regex patterns for PII
+        self.patterns = _PII_PATTERNS
         
         # Confidential keywords
         self.confidential_keywords = [
@@ -30,8 +61,14 @@ class PIIDetector:
             'do not share', 'restricted', 'classified',
             'trade secret', 'sensitive'
         ]
+        
+        if PIIDetector._matcher is None:
+            PIIDetector._matcher = KeywordMatcher({
+                'confidential': self.confidential_keywords
+            })
     
-    def detect_pii_and_confidential(self, email: ProcessedEmail) -> Tuple[bool, List[str]]:
+    def detect_pii_and_confidential(self, email: ProcessedEmail,
+                                    scan: Optional[GuardrailScan] = None) -> Tuple[bool, List[str]]:
         """
         G1: PII and Confidential Data Detection
         
@@ -42,33 +79,32 @@ class PIIDetector:
         logger.debug(f"Scanning for PII: {email.metadata.subject}")
         
         detected = []
+        scan = scan or GuardrailScan.of(email)
         
         # Scan email content
-        text = f"{email.metadata.subject}\n{email.metadata.body_text}"
+        text = scan.text
         
         # Check for PII patterns
-        for pii_type, pattern in self.patterns.items():
-            matches = re.findall(pattern, text)
+        for pii_type, pattern in self._candidate_patterns(text):
+            matches = pattern.findall(text)
             if matches:
                 detected.append(pii_type)
                 logger.warning(f"⚠️ Detected {pii_type}: {len(matches)} occurrence(s)")
         
         # Check draft reply if exists
-        if email.draft_reply:
-            draft_text = f"{email.draft_reply.subject}\n{email.draft_reply.body}"
-            for pii_type, pattern in self.patterns.items():
-                matches = re.findall(pattern, draft_text)
+        if scan.draft_text is not None:
+            draft_text = scan.draft_text
+            for pii_type, pattern in self._candidate_patterns(draft_text):
+                matches = pattern.findall(draft_text)
                 if matches and pii_type not in detected:
                     detected.append(f"{pii_type}_in_draft")
                     logger.warning(f"⚠️ Detected {pii_type} in DRAFT: {len(matches)} occurrence(s)")
         
-        # Check for confidential keywords
-        text_lower = text.lower()
-        for keyword in self.confidential_keywords:
-            if keyword in text_lower:
-                detected.append('confidential_marker')
-                logger.warning(f"⚠️ Confidential marker found: '{keyword}'")
-                break
+        # Check for confidential keywords (first one in list order is reported)
+        markers = self._matcher.find(scan.text_lower)['confidential']
+        if markers:
+            detected.append('confidential_marker')
+            logger.warning(f"⚠️ Confidential marker found: '{markers[0]}'")
         
         has_pii = len(detected) > 0
         
@@ -90,20 +126,18 @@ class PIIDetector:
         
         return has_pii, detected
     
+    def _candidate_patterns(self, text: str):
+        """Patterns worth running on text: none when the combined scan finds nothing"""
+        if self.patterns is _PII_PATTERNS and not _PII_ANY.search(text):
+            return ()
+        return self.patterns.items()
+    
     def anonymize_text(self, text: str) -> str:
         """Anonymize PII in text (for logging/display purposes)"""
         anonymized = text
         
-        # Replace SSN
-        anonymized = re.sub(r'\b\d{3}-\d{2}-\d{4}\b', 'XXX-XX-XXXX', anonymized)
-        
-        # Replace credit card
-        anonymized = re.sub(r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b', 'XXXX-XXXX-XXXX-XXXX', anonymized)
-        
-        # Replace phone
-        anonymized = re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', 'XXX-XXX-XXXX', anonymized)
-        
-        # Replace API keys
-        anonymized = re.sub(r'\b[A-Za-z0-9]{32,}\b', '[REDACTED_API_KEY]', anonymized)
+        # Replace SSN, credit card, phone and API keys
+        for pattern, replacement in _ANONYMIZE_RULES:
+            anonymized = pattern.sub(replacement, anonymized)
         
         return anonymized
@@ -0,0 +1,70 @@
+"""
+Guardrail Pipeline
+Runs the G1-G4 checks for an email over one shared scan
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+from models import ProcessedEmail
+from .pii_detector import PIIDetector
+from .domain_checker import DomainChecker
+from .tone_enforcer import ToneEnforcer
+from .scanner import GuardrailScan
+
+
+@dataclass(slots=True)
+class GuardrailResult:
+    """Outcome of the G1-G4 checks for one email"""
+    has_pii: bool
+    pii_types: List[str] = field(default_factory=list)
+    domain_approved: bool = True
+    tone_approved: bool = True
+    tone_issues: List[str] = field(default_factory=list)
+    is_external: bool = False
+
+
+class GuardrailPipeline:
+    """
+    Runs PII detection, domain restrictions, tone enforcement and the
+    external-recipient check together
+
+    Every email is scanned once: the subject/body and draft texts are
+    assembled and lowercased a single time, each keyword list is matched
+    with one automaton walk, and the recipient domains are extracted once
+    for both domain checks. The checks still set their own flags on the
+    email, exactly as when called one by one.
+    """
+
+    def __init__(self, pii_detector: Optional[PIIDetector] = None,
+                 domain_checker: Optional[DomainChecker] = None,
+                 tone_enforcer: Optional[ToneEnforcer] = None):
+        self.pii_detector = pii_detector or PIIDetector()
+        self.domain_checker = domain_checker or DomainChecker()
+        self.tone_enforcer = tone_enforcer or ToneEnforcer()
+
+    def process(self, email: ProcessedEmail) -> GuardrailResult:
+        """G1-G4 for one email"""
+        scan = GuardrailScan.of(email)
+
+        # G1: PII Detection
+        has_pii, pii_types = self.pii_detector.detect_pii_and_confidential(email, scan)
+
+        # G2: Domain Restriction Check
+        domain_approved = self.domain_checker.check_domain_restrictions(email, scan)
+
+        # G3: Safe Tone Enforcement
+        if email.draft_reply:
+            tone_approved, tone_issues = self.tone_enforcer.enforce_safe_tone(email, scan)
+        else:
+            tone_approved, tone_issues = True, []
+
+        # G4: External Email?
+        is_external = self.domain_checker.is_external_email(email, scan)
+
+        return GuardrailResult(
+            has_pii=has_pii,
+            pii_types=pii_types,
+            domain_approved=domain_approved,
+            tone_approved=tone_approved,
+            tone_issues=tone_issues,
+            is_external=is_external
+        )
@@ -0,0 +1,35 @@
+"""
+Guardrail Text Scan
+Builds the email and draft texts shared by the guardrail checks
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+from models import ProcessedEmail
+
+
+@dataclass(slots=True)
+class GuardrailScan:
+    """
+    Text views of one email, built once and read by G1-G3
+
+    Without it every check assembles and lowercases the same subject/body
+    (and draft subject/body) strings on its own.
+    """
+    text: str  # Subject and body as received
+    text_lower: str
+    draft_text: Optional[str] = None  # Draft subject and body, None without a draft
+    draft_lower: Optional[str] = None
+    recipient_domains: Optional[List[str]] = None  # Filled in by DomainChecker on first use
+
+    @classmethod
+    def of(cls, email: ProcessedEmail) -> "GuardrailScan":
+        """Build the scan for an email"""
+        metadata = email.metadata
+        draft = email.draft_reply
+        return cls(
+            text=f"{metadata.subject}\n{metadata.body_text}",
+            # Same string the detectors lowercased already; reuse their copy
+            text_lower=metadata.full_text_lower,
+            draft_text=f"{draft.subject}\n{draft.body}" if draft else None,
+            draft_lower=draft.text_lower if draft else None
+        )
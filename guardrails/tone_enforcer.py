@@ -2,9 +2,10 @@
 G3: Safe Tone Enforcement
 """
 import logging
-import re
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from models import ProcessedEmail, SecurityFlag
+from core.keyword_matcher import KeywordMatcher
+from .scanner import GuardrailScan
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +13,9 @@ logger = logging.getLogger(__name__)
 class ToneEnforcer:
     """Enforces safe, professional tone in email drafts"""
     
+    # Shared matcher for the substring word lists, built once per process
+    _matcher = None
+    
     def __init__(self):
         # Aggressive/risky words and phrases
         self.aggressive_words = [
@@ -36,8 +40,16 @@ class ToneEnforcer:
             'asap', 'fyi', 'btw', 'lol', 'omg', 'wtf',
             'yeah', 'nope', 'gonna', 'wanna', 'gotta'
         ]
+        
+        if ToneEnforcer._matcher is None:
+            ToneEnforcer._matcher = KeywordMatcher({
+                'aggressive': self.aggressive_words,
+                'risky': self.risky_phrases,
+                'liability': self.liability_phrases
+            })
     
-    def enforce_safe_tone(self, email: ProcessedEmail) -> Tuple[bool, List[str]]:
+    def enforce_safe_tone(self, email: ProcessedEmail,
+                          scan: Optional[GuardrailScan] = None) -> Tuple[bool, List[str]]:
         """
         G3: Safe Tone Enforcement
         
@@ -53,29 +65,32 @@ class ToneEnforcer:
         
         issues = []
         
-        draft_text = f"{email.draft_reply.subject}\n{email.draft_reply.body}".lower()
+        scan = scan or GuardrailScan.of(email)
+        draft_text = scan.draft_lower
+        
+        # Aggressive words, risky and liability phrases (single scan)
+        found = self._matcher.find(draft_text)
         
         # Check for aggressive words
-        for word in self.aggressive_words:
-            if word in draft_text:
-                issues.append(f"Aggressive language: '{word}'")
-                logger.warning(f"⚠️ Aggressive word found: '{word}'")
+        for word in found['aggressive']:
+            issues.append(f"Aggressive language: '{word}'")
+            logger.warning(f"⚠️ Aggressive word found: '{word}'")
         
         # Check for risky phrases
-        for phrase in self.risky_phrases:
-            if phrase in draft_text:
-                issues.append(f"Risky phrase: '{phrase}'")
-                logger.warning(f"⚠️ Risky phrase found: '{phrase}'")
+        for phrase in found['risky']:
+            issues.append(f"Risky phrase: '{phrase}'")
+            logger.warning(f"⚠️ Risky phrase found: '{phrase}'")
         
         # Check for liability phrases
-        for phrase in self.liability_phrases:
-            if phrase in draft_text:
-                issues.append(f"Legal liability: '{phrase}'")
-                logger.warning(f"⚠️ Liability phrase found: '{phrase}'")
+        for phrase in found['liability']:
+            issues.append(f"Legal liability: '{phrase}'")
+            logger.warning(f"⚠️ Liability phrase found: '{phrase}'")
         
-        # Check for unprofessional language
+        # Check for unprofessional language, as whole space-separated words
+        # (same as matching f" {word} " against f" {draft_text} ")
+        draft_words = set(draft_text.split(' '))
         for word in self.unprofessional:
-            if f" {word} " in f" {draft_text} ":  # Word boundaries
+            if word in draft_words:
                 issues.append(f"Unprofessional: '{word}'")
                 logger.warning(f"⚠️ Unprofessional word found: '{word}'")
         
@@ -85,9 +100,14 @@ class ToneEnforcer:
             issues.append(f"Excessive exclamation marks ({exclamation_count})")
             logger.warning(f"⚠️ Too many exclamation marks: {exclamation_count}")
         
-        # Check for all caps words (shouting)
-        words = draft_text.split()
-        caps_words = [w for w in words if w.isupper() and len(w) > 3]
+        # Check for all caps words (shouting). Needs the original case: on
+        # the lowercased text no word is ever upper. Two words are enough.
+        caps_words = []
+        for w in scan.draft_text.split():
+            if len(w) > 3 and w.isupper():
+                caps_words.append(w)
+                if len(caps_words) > 1:
+                    break
         if len(caps_words) > 1:
             issues.append(f"All-caps words (appears like shouting)")
             logger.warning(f"⚠️ All-caps words found: {caps_words}")
@@ -391,7 +391,26 @@ if page == "📊 Dashboard":
             st.error(f"❌ Error: {str(e)}")
             import traceback
             st.code(traceback.format_exc())
-    
+
+    # Drafts the last run queued for approval (S13); the next run drops undecided ones
+    pending_approvals = st.session_state.agent.pending_approvals
+    if pending_approvals:
+        st.markdown("---")
+        st.markdown(f"### 🧠 Drafts Awaiting Approval ({len(pending_approvals)})")
+        for message_id, email in list(pending_approvals.items()):
+            with st.expander(f"📧 {email.metadata.subject}", expanded=True):
+                st.text_area("Draft Body:", value=email.draft_reply.body, height=150,
+                             key=f"approval_body_{message_id}", disabled=True)
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("✅ Approve", key=f"approve_{message_id}", use_container_width=True):
+                        st.session_state.agent.process_approvals({message_id: True})
+                        st.rerun()
+                with col2:
+                    if st.button("❌ Decline", key=f"decline_{message_id}", use_container_width=True):
+                        st.session_state.agent.process_approvals({message_id: False})
+                        st.rerun()
+
     # Display draft if it exists in session state (OUTSIDE the process button block)
     if 'compose_result' in st.session_state:
         import logging
@@ -904,8 +923,8 @@ Rules:
                         cc_list = [e.strip() for e in cc_email.split(',') if e.strip() and cc_email] if cc_email else []
                         
                         # Send email directly
-                        from tools import GmailClient
-                        gmail = GmailClient()
+                        from tools import get_gmail_client
+                        gmail = get_gmail_client()
                         success = gmail.send_email(to=to_list, subject=subject, body=body)
                         
                         if success:
@@ -3,8 +3,8 @@ Data models for Email Agent
 """
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from enum import Enum
+from typing import List, Optional, Dict, Any, Tuple
+from enum import Enum, IntFlag
 
 
 class EmailCategory(Enum):
@@ -50,7 +50,43 @@ class SenderType(Enum):
     SPAM = "spam"
 
 
-@dataclass
+class IntentFlag(IntFlag):
+    """Detected intents packed into a bit mask"""
+    URGENT = 1
+    LEGAL = 2
+    FINANCE = 4
+    REQUEST = 8
+    QUESTION = 16
+    MEETING = 32
+    NOTIFICATION = 64
+    COMPLAINT = 128
+    SALES = 256
+    INFO = 512
+    
+    @classmethod
+    def from_names(cls, names: List[str]) -> "IntentFlag":
+        """Build a mask from intent names ('urgent', 'legal', ...)"""
+        mask = cls(0)
+        for name in names:
+            mask |= _INTENT_FLAGS.get(name, 0)
+        return mask
+
+
+_INTENT_FLAGS = {
+    'urgent': IntentFlag.URGENT,
+    'legal': IntentFlag.LEGAL,
+    'finance': IntentFlag.FINANCE,
+    'request': IntentFlag.REQUEST,
+    'question': IntentFlag.QUESTION,
+    'meeting': IntentFlag.MEETING,
+    'notification': IntentFlag.NOTIFICATION,
+    'complaint': IntentFlag.COMPLAINT,
+    'sales': IntentFlag.SALES,
+    'informational': IntentFlag.INFO
+}
+
+
+@dataclass(slots=True)
 class EmailMetadata:
     """Extracted email metadata"""
     message_id: str
@@ -68,9 +104,18 @@ class EmailMetadata:
     snippet: str = ""
     body_text: str = ""
     body_html: str = ""
+    _full_text_lower: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def full_text_lower(self) -> str:
+        """Lowercased subject and body, computed once and shared by the detectors"""
+        text = self._full_text_lower
+        if text is None:
+            text = self._full_text_lower = f"{self.subject}\n{self.body_text}".lower()
+        return text
 
 
-@dataclass
+@dataclass(slots=True)
 class ClassificationResult:
     """Results from sender classification"""
     sender_type: SenderType
@@ -82,7 +127,7 @@ class ClassificationResult:
     notes: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class IntentDetection:
     """Intent detection results"""
     primary_intent: str
@@ -92,9 +137,15 @@ class IntentDetection:
     action_required: bool = False
     question_detected: bool = False
     confidence: float = 0.0
+    intent_mask: IntentFlag = IntentFlag(0)
+    
+    def __post_init__(self):
+        # Keep the mask in step with the intent names when not given
+        if not self.intent_mask and self.intents:
+            self.intent_mask = IntentFlag.from_names(self.intents)
 
 
-@dataclass
+@dataclass(slots=True)
 class PriorityScore:
     """Priority scoring results"""
     score: int  # 0-100
@@ -106,7 +157,7 @@ class PriorityScore:
     hidden_urgency: bool = False  # Polite email but urgent deadline
 
 
-@dataclass
+@dataclass(slots=True)
 class DraftReply:
     """Draft email reply"""
     draft_id: Optional[str] = None
@@ -124,9 +175,20 @@ class DraftReply:
     evidence: List[str] = field(default_factory=list)  # Evidence/context used
     external_recipients: int = 0  # Number of external recipients
     reply_all_risk: bool = False  # Large reply-all detected
+    _text_lower: Optional[Tuple[str, str, str]] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def text_lower(self) -> str:
+        """Lowercased subject and body, cached until either is reassigned"""
+        cached = self._text_lower
+        if cached is not None and cached[0] is self.subject and cached[1] is self.body:
+            return cached[2]
+        text = f"{self.subject}\n{self.body}".lower()
+        self._text_lower = (self.subject, self.body, text)
+        return text
 
 
-@dataclass
+@dataclass(slots=True)
 class FollowUp:
     """Follow-up reminder"""
     email_id: str
@@ -136,7 +198,7 @@ class FollowUp:
     draft_message: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class SecurityFlag:
     """Security/guardrail flag"""
     flag_type: str
@@ -146,7 +208,7 @@ class SecurityFlag:
     blocks_sending: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessedEmail:
     """Complete processed email with all analysis"""
     # Original metadata
@@ -189,7 +251,7 @@ class ProcessedEmail:
     processed_at: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessingBatch:
     """Batch of emails being processed"""
     batch_id: str
@@ -204,9 +266,10 @@ class ProcessingBatch:
     blocked_count: int = 0
     errors: List[str] = field(default_factory=list)
     outgoing_drafts: List[Any] = field(default_factory=list)
+    pending_approvals: List[ProcessedEmail] = field(default_factory=list)  # Drafts awaiting a user decision
 
 
-@dataclass
+@dataclass(slots=True)
 class MetricsReport:
     """Final metrics report"""
     total_emails: int
@@ -35,12 +35,13 @@ class PromptInterpreter:
     }
 
     _email_regex = re.compile(r"[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}")
-    def __init__(self):
+    def __init__(self, client=None):
+        """client: optional genai.Client to share instead of creating one"""
         self.use_gemini = Config.GEMINI_ENABLED and bool(Config.GEMINI_API_KEY) and genai is not None
         self.ollama = LLMAdapter(model="llama3.1:8b")
 
-        self.gemini_client = None
-        if self.use_gemini:
+        self.gemini_client = client
+        if self.use_gemini and self.gemini_client is None:
             try:
                 self.gemini_client = genai.Client(api_key=Config.GEMINI_API_KEY)
             except Exception as e:
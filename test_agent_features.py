@@ -1,10 +1,21 @@
 """
 Email Agent Feature Verification Test Script
 Tests all PRD requirements to ensure proper implementation
+
+Run directly for the full PASS/FAIL summary, or collect the sections as
+independent tests with pytest (pytest -n auto with pytest-xdist).
 """
+import functools
+import io
+import json
 import logging
+import re
 import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
+from types import SimpleNamespace
 from datetime import datetime, timedelta
 
 # Add project root to path
@@ -28,6 +39,11 @@ from guardrails import PIIDetector, DomainChecker, ToneEnforcer
 from output import QueueBuilder, MetricsGenerator
 from logs.metrics_tracker import MetricsTracker
 
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -35,10 +51,16 @@ logger = logging.getLogger(__name__)
 class FeatureVerifier:
     """Verifies all PRD features are working correctly"""
     
-    def __init__(self):
+    def __init__(self, strict: bool = False):
+        # strict: raise on the first failed check (pytest mode) instead of
+        # collecting it for the summary
+        self.strict = strict
         self.results = []
         self.passed = 0
         self.failed = 0
+        
+        # Per-test status lines, written out once by print_summary
+        self._buf = io.StringIO()
     
     def test(self, name: str, condition: bool, details: str = ""):
         """Test a single feature"""
@@ -52,10 +74,13 @@ class FeatureVerifier:
         
         if condition:
             self.passed += 1
-            logger.info(f"{status}: {name}")
+            self._buf.write(f"{status}: {name}\n")
         else:
             self.failed += 1
-            logger.error(f"{status}: {name} - {details}")
+            self._buf.write(f"{status}: {name} - {details}\n")
+            logger.error("%s: %s - %s", status, name, details)
+            if self.strict:
+                raise AssertionError(f"{name}: {details}")
         
         return condition
     
@@ -64,6 +89,8 @@ class FeatureVerifier:
         total = self.passed + self.failed
         pass_rate = (self.passed / total * 100) if total > 0 else 0
         
+        sys.stdout.write(self._buf.getvalue())
+        
         print("\n" + "="*70)
         print("📊 EMAIL AGENT PRD VERIFICATION SUMMARY")
         print("="*70)
@@ -82,114 +109,176 @@ class FeatureVerifier:
         print("\n")
 
 
+# Shared test email; create_test_email copies it with the per-test fields
+# and fresh address/label lists, so the copies never share a mutable list.
+_PROTOTYPE = EmailMetadata(
+    message_id="test_123",
+    thread_id="thread_123",
+    subject="",
+    sender="test@example.com",
+    sender_name="Test Sender",
+    recipients=[],
+    cc=[],
+    bcc=[],
+    date=datetime.now(),
+    has_attachments=False,
+    attachment_count=0,
+    labels=[],
+    snippet="",
+    body_text="",
+    body_html=""
+)
+
+
 def create_test_email(subject="Test Email", body="This is a test email.", 
                      sender="test@example.com", is_urgent=False) -> EmailMetadata:
     """Create test email metadata"""
     if is_urgent:
         body = "URGENT: This requires immediate attention. Deadline is today!"
     
-    return EmailMetadata(
-        message_id="test_123",
-        thread_id="thread_123",
+    return replace(
+        _PROTOTYPE,
         subject=subject,
         sender=sender,
-        sender_name="Test Sender",
         recipients=["user@company.com"],
         cc=[],
         bcc=[],
-        date=datetime.now(),
-        has_attachments=False,
-        attachment_count=0,
         labels=[],
+        date=datetime.now(),
         snippet=body[:100],
-        body_text=body,
-        body_html=""
+        body_text=body
     )
 
 
-def main():
-    """Run all verification tests"""
-    print("\n" + "="*70)
-    print("🚀 STARTING EMAIL AGENT PRD VERIFICATION")
-    print("="*70 + "\n")
-    
-    verifier = FeatureVerifier()
-    
-    # ============================================================
-    # SECTION 1: Core Modules Initialization
-    # ============================================================
-    print("\n📦 SECTION 1: Core Modules Initialization")
-    print("-" * 70)
-    
-    try:
-        classifier = SenderClassifier()
-        verifier.test("SenderClassifier initialization", True)
-    except Exception as e:
-        verifier.test("SenderClassifier initialization", False, str(e))
-    
+def _probe(name: str, cls):
+    """Construct one module, returning (name, instance, error)"""
     try:
-        intent_detector = IntentDetector()
-        verifier.test("IntentDetector initialization", True)
+        return name, cls(), ""
     except Exception as e:
-        verifier.test("IntentDetector initialization", False, str(e))
-    
-    try:
-        priority_scorer = PriorityScorer()
-        verifier.test("PriorityScorer initialization", True)
-    except Exception as e:
-        verifier.test("PriorityScorer initialization", False, str(e))
-    
-    try:
-        categorizer = EmailCategorizer()
-        verifier.test("EmailCategorizer initialization", True)
-    except Exception as e:
-        verifier.test("EmailCategorizer initialization", False, str(e))
-    
-    try:
-        spam_filter = SpamFilter()
-        verifier.test("SpamFilter initialization", True)
-    except Exception as e:
-        verifier.test("SpamFilter initialization", False, str(e))
-    
-    try:
-        thread_summarizer = ThreadSummarizer()
-        verifier.test("ThreadSummarizer initialization", True)
-    except Exception as e:
-        verifier.test("ThreadSummarizer initialization", False, str(e))
-    
-    try:
-        reply_drafter = ReplyDrafter()
-        verifier.test("ReplyDrafter initialization", True)
-    except Exception as e:
-        verifier.test("ReplyDrafter initialization", False, str(e))
-    
-    try:
-        pii_detector = PIIDetector()
-        verifier.test("PIIDetector initialization", True)
-    except Exception as e:
-        verifier.test("PIIDetector initialization", False, str(e))
-    
-    try:
-        domain_checker = DomainChecker()
-        verifier.test("DomainChecker initialization", True)
-    except Exception as e:
-        verifier.test("DomainChecker initialization", False, str(e))
+        return name, None, str(e)
+
+
+# Module constructors probed by Section 1 and reused by the later sections
+_INIT_SPECS = (
+    ("SenderClassifier", SenderClassifier),
+    ("IntentDetector", IntentDetector),
+    ("PriorityScorer", PriorityScorer),
+    ("EmailCategorizer", EmailCategorizer),
+    ("SpamFilter", SpamFilter),
+    ("ThreadSummarizer", ThreadSummarizer),
+    ("ReplyDrafter", ReplyDrafter),
+    ("PIIDetector", PIIDetector),
+    ("DomainChecker", DomainChecker),
+    ("ToneEnforcer", ToneEnforcer),
+    ("MetricsTracker", MetricsTracker),
+)
+_Shared = namedtuple('_Shared', [name for name, _ in _INIT_SPECS])
+
+
+@functools.lru_cache(maxsize=None)
+def _shared():
+    """
+    Construct every module once, returning (probes, instances)
+
+    probes holds (name, instance, error) in spec order. The constructors are
+    independent, so they are probed concurrently.
+    """
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        probes = tuple(executor.map(lambda spec: _probe(*spec), _INIT_SPECS))
+    return probes, _Shared(*(instance for _, instance, _ in probes))
+
+
+# Fixed inputs of the priority (Section 2) and legal content (Section 5) tests
+_VIP_CLASS = ClassificationResult(
+    sender_type=SenderType.VIP,
+    sender_email="ceo@company.com",
+    sender_domain="company.com",
+    is_vip=True,
+    confidence=1.0
+)
+_LEGAL_PRIORITY = PriorityScore(
+    score=75,
+    priority_level=PriorityLevel.HIGH,
+    factors={},
+    confidence=0.9
+)
+
+
+def _question_email() -> EmailMetadata:
+    """Question about a deadline (Sections 2 and 4)"""
+    return create_test_email(
+        subject="Quick question about the project",
+        body="Can you please clarify the deadline? When is this due?"
+    )
+
+
+def _polite_urgent_email() -> EmailMetadata:
+    """Polite request with a same-day deadline (Sections 2 and 4)"""
+    return create_test_email(
+        subject="Quick request",
+        body="Please kindly review this by end of day today. Thank you!"
+    )
+
+
+def _summary_email() -> EmailMetadata:
+    """Meeting notes with a decision, question and action (Sections 3 and 4)"""
+    return create_test_email(
+        subject="Project Update Meeting",
+        body="We decided to move forward with option A. Question: What is the timeline? Action: John will follow up next week."
+    )
+
+
+class _FakeGemini:
+    """Stands in for genai.Client, echoing each "Update N" body as a summary"""
     
-    try:
-        tone_enforcer = ToneEnforcer()
-        verifier.test("ToneEnforcer initialization", True)
-    except Exception as e:
-        verifier.test("ToneEnforcer initialization", False, str(e))
+    def __init__(self):
+        self.models = self
+        self.calls = 0
+    
+    def generate_content(self, model, contents):
+        self.calls += 1
+        numbers = re.findall(r"Update (\d+)", contents)
+        if '"summaries"' not in contents:
+            return SimpleNamespace(text=json.dumps({"summary": f"Thread {numbers[0]}"}))
+        # Thread 3 gets a malformed entry, which must fall back to its own request
+        entries = [{"summary": f"Thread {n}"} if n != "3" else "n/a" for n in numbers]
+        return SimpleNamespace(text=json.dumps({"summaries": entries}))
+
+
+if pytest is not None:
+    @pytest.fixture(scope="session")
+    def shared():
+        """Module instances shared by every section"""
+        return _shared()[1]
+    
+    @pytest.fixture
+    def verifier():
+        """Verifier that fails the test on the first failed check"""
+        return FeatureVerifier(strict=True)
+
+
+# ============================================================
+# SECTION 1: Core Modules Initialization
+# ============================================================
+def test_section1_initialization(verifier):
+    """Every module constructs cleanly"""
+    print("\n📦 SECTION 1: Core Modules Initialization")
+    print("-" * 70)
     
-    try:
-        metrics_tracker = MetricsTracker()
-        verifier.test("MetricsTracker initialization", True)
-    except Exception as e:
-        verifier.test("MetricsTracker initialization", False, str(e))
+    probes, _ = _shared()
+    for name, instance, error in probes:
+        verifier.test(f"{name} initialization", instance is not None, error)
+
+
+# ============================================================
+# SECTION 2: Classification & Prioritization
+# ============================================================
+def test_section2_classification(verifier, shared):
+    """Sender classification, intent detection and priority scoring"""
+    classifier = shared.SenderClassifier
+    intent_detector = shared.IntentDetector
+    priority_scorer = shared.PriorityScorer
     
-    # ============================================================
-    # SECTION 2: Classification & Prioritization
-    # ============================================================
     print("\n🔍 SECTION 2: Classification & Prioritization")
     print("-" * 70)
     
@@ -203,11 +292,7 @@ def main():
     )
     
     # Test intent detection
-    question_email = create_test_email(
-        subject="Quick question about the project",
-        body="Can you please clarify the deadline? When is this due?"
-    )
-    intent = intent_detector.detect(question_email)
+    intent = intent_detector.detect(_question_email())
     verifier.test(
         "Question detection",
         intent.question_detected,
@@ -224,15 +309,8 @@ def main():
     )
     
     # Test priority scoring
-    urgent_classification = ClassificationResult(
-        sender_type=SenderType.VIP,
-        sender_email="ceo@company.com",
-        sender_domain="company.com",
-        is_vip=True,
-        confidence=1.0
-    )
     priority = priority_scorer.calculate_score(
-        urgent_email, urgent_classification, urgent_intent
+        urgent_email, _VIP_CLASS, urgent_intent
     )
     verifier.test(
         "Priority scoring (VIP + urgent)",
@@ -241,10 +319,7 @@ def main():
     )
     
     # Test hidden urgency detection
-    polite_urgent = create_test_email(
-        subject="Quick request",
-        body="Please kindly review this by end of day today. Thank you!"
-    )
+    polite_urgent = _polite_urgent_email()
     polite_intent = intent_detector.detect(polite_urgent)
     polite_priority = priority_scorer.calculate_score(
         polite_urgent, classification, polite_intent
@@ -254,18 +329,20 @@ def main():
         polite_priority.hidden_urgency,
         "Polite language + deadline should trigger hidden urgency"
     )
+
+
+# ============================================================
+# SECTION 3: Thread Summarization
+# ============================================================
+def test_section3_summarization(verifier, shared):
+    """Rule-based thread summaries"""
+    thread_summarizer = shared.ThreadSummarizer
     
-    # ============================================================
-    # SECTION 3: Thread Summarization
-    # ============================================================
     print("\n📝 SECTION 3: Thread Summarization")
     print("-" * 70)
     
     # Test thread summarization
-    test_email = create_test_email(
-        subject="Project Update Meeting",
-        body="We decided to move forward with option A. Question: What is the timeline? Action: John will follow up next week."
-    )
+    test_email = _summary_email()
     summary = thread_summarizer.summarize_single_email(test_email)
     
     verifier.test(
@@ -287,9 +364,29 @@ def main():
         f"Found {len(summary.get('decisions_made', []))} decisions"
     )
     
-    # ============================================================
-    # SECTION 4: Drafting & Reply Generation
-    # ============================================================
+    # Test batched summaries (EmailAgent.process_batch prefetch)
+    gemini = _FakeGemini()
+    batch_summarizer = ThreadSummarizer(client=gemini)
+    batch_summarizer.use_gemini = True
+    threads = [[create_test_email(subject=f"Batch {i}", body=f"Update {i}")] for i in range(10)]
+    batch = batch_summarizer.summarize_threads_batch(threads)
+    verifier.test(
+        "Batched thread summaries",
+        gemini.calls == 3 and [s.get('summary') for s in batch] == [f"Thread {i}" for i in range(10)],
+        f"{gemini.calls} Gemini request(s) for {len(threads)} threads"
+    )
+
+
+# ============================================================
+# SECTION 4: Drafting & Reply Generation
+# ============================================================
+def test_section4_drafting(verifier, shared):
+    """Draft replies and reply-all risk"""
+    reply_drafter = shared.ReplyDrafter
+    test_email = _summary_email()
+    intent = shared.IntentDetector.detect(_question_email())
+    polite_intent = shared.IntentDetector.detect(_polite_urgent_email())
+    
     print("\n✍️ SECTION 4: Drafting & Reply Generation")
     print("-" * 70)
     
@@ -352,10 +449,16 @@ def main():
                 draft_many.reply_all_risk,
                 f"{len(many_recipients.recipients)} recipients should trigger risk"
             )
+
+
+# ============================================================
+# SECTION 5: Guardrails & Safety
+# ============================================================
+def test_section5_guardrails(verifier, shared):
+    """PII, tone and legal content guardrails"""
+    pii_detector = shared.PIIDetector
+    tone_enforcer = shared.ToneEnforcer
     
-    # ============================================================
-    # SECTION 5: Guardrails & Safety
-    # ============================================================
     print("\n🛡️ SECTION 5: Guardrails & Safety")
     print("-" * 70)
     
@@ -407,12 +510,7 @@ def main():
         metadata=create_test_email(
             body="We hereby agree to the binding contract terms and legal obligations."
         ),
-        priority=PriorityScore(
-            score=75,
-            priority_level=PriorityLevel.HIGH,
-            factors={},
-            confidence=0.9
-        )
+        priority=_LEGAL_PRIORITY
     )
     is_critical = LegalFinanceDetector().check_legal_finance_content_urgent(legal_email)
     
@@ -421,10 +519,15 @@ def main():
         is_critical,
         "Legal keywords in urgent email should be flagged"
     )
+
+
+# ============================================================
+# SECTION 6: Metrics Tracking
+# ============================================================
+def test_section6_metrics(verifier, shared):
+    """Metrics tracking"""
+    metrics_tracker = shared.MetricsTracker
     
-    # ============================================================
-    # SECTION 6: Metrics Tracking
-    # ============================================================
     print("\n📊 SECTION 6: Metrics Tracking")
     print("-" * 70)
     
@@ -493,10 +596,19 @@ def main():
         )
     except Exception as e:
         verifier.test("Metrics report generation", False, str(e))
+
+
+# ============================================================
+# SECTION 7: Evidence & Traceability
+# ============================================================
+def test_section7_evidence(verifier, shared):
+    """Evidence and reasoning on scores and classifications"""
+    classification = shared.SenderClassifier.classify(create_test_email(sender="ceo@company.com"))
+    urgent_email = create_test_email(is_urgent=True)
+    priority = shared.PriorityScorer.calculate_score(
+        urgent_email, _VIP_CLASS, shared.IntentDetector.detect(urgent_email)
+    )
     
-    # ============================================================
-    # SECTION 7: Evidence & Traceability
-    # ============================================================
     print("\n🔍 SECTION 7: Evidence & Traceability")
     print("-" * 70)
     
@@ -525,10 +637,13 @@ def main():
         bool(classification.notes),
         classification.notes[:50]
     )
-    
-    # ============================================================
-    # SECTION 8: Edge Cases
-    # ============================================================
+
+
+# ============================================================
+# SECTION 8: Edge Cases
+# ============================================================
+def test_section8_edge_cases(verifier):
+    """Sender conflicts and DND mode"""
     print("\n⚠️ SECTION 8: Edge Cases")
     print("-" * 70)
     
@@ -566,10 +681,27 @@ def main():
         has_alert,
         reason
     )
+
+
+def main():
+    """Run all verification tests"""
+    print("\n" + "="*70)
+    print("🚀 STARTING EMAIL AGENT PRD VERIFICATION")
+    print("="*70 + "\n")
+    
+    verifier = FeatureVerifier()
+    
+    test_section1_initialization(verifier)
+    
+    shared = _shared()[1]
+    test_section2_classification(verifier, shared)
+    test_section3_summarization(verifier, shared)
+    test_section4_drafting(verifier, shared)
+    test_section5_guardrails(verifier, shared)
+    test_section6_metrics(verifier, shared)
+    test_section7_evidence(verifier, shared)
+    test_section8_edge_cases(verifier)
     
-    # ============================================================
-    # FINAL SUMMARY
-    # ============================================================
     verifier.print_summary()
     
     # Return exit code
@@ -1,7 +1,7 @@
 """
 Tools module for external integrations
 """
-from .gmail_client import GmailClient
+from .gmail_client import GmailClient, get_gmail_client
 from .permissions import PermissionChecker
 
-__all__ = ['GmailClient', 'PermissionChecker']
+__all__ = ['GmailClient', 'get_gmail_client', 'PermissionChecker']
@@ -4,21 +4,56 @@ Gmail API client wrapper
 import os
 import base64
 import logging
-from typing import List, Optional, Dict, Any
+import random
+import re
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+import google_auth_httplib2
+import httplib2
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.utils import parsedate_to_datetime
 
 from config import Config
 from models import EmailMetadata
 
 logger = logging.getLogger(__name__)
 
+# Addresses in To/Cc/Bcc headers, and the display name before <address>
+_ADDRESS_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+_NAME_RE = re.compile(r'^(.*?)\s*<')
+
+# Banner line around the send logs
+_SEP = "=" * 60
+
+# Calls per Gmail batch request. Gmail accepts up to 100, but each part is
+# charged quota on its own (messages.get is 5 units), and large bursts get
+# per-part rateLimitExceeded errors
+_BATCH_LIMIT = 50
+
+# Errors worth retrying with backoff. Rate-limit rejections mean Gmail did
+# not act on the request, so any call may retry them; a 5xx may come back
+# after the work was done, so only idempotent calls (list/get) retry those.
+_RATE_LIMIT_STATUSES = frozenset({429})
+_RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+_TRANSIENT_STATUSES = frozenset({500, 503})
+
+# Connection-level failures (timeouts, resets, DNS)
+_TRANSPORT_ERRORS = (OSError, httplib2.HttpLib2Error)
+
+# Process-wide client returned by get_gmail_client
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
 
 class GmailClient:
     """Gmail API client for email operations"""
@@ -26,6 +61,10 @@ class GmailClient:
     def __init__(self):
         self.service = None
         self.credentials = None
+        # Per-thread HTTP connections (httplib2.Http is not thread-safe)
+        self._local = threading.local()
+        # Caps API requests in flight across all threads using this client
+        self._inflight = threading.BoundedSemaphore(max(1, Config.GMAIL_CONCURRENCY))
         self._authenticate()
     
     def _authenticate(self):
@@ -67,9 +106,45 @@ class GmailClient:
                 token.write(creds.to_json())
         
         self.credentials = creds
-        self.service = build('gmail', 'v1', credentials=creds)
+        # Bundled (static) discovery document; no discovery cache lookups
+        self.service = build(
+            'gmail', 'v1', credentials=creds,
+            requestBuilder=self._build_request, cache_discovery=False
+        )
         logger.info("✓ Gmail API authenticated successfully")
     
+    def _build_request(self, http, *args, **kwargs) -> HttpRequest:
+        """Bind each API request to the calling thread's own authorized connection"""
+        local_http = getattr(self._local, 'http', None)
+        if local_http is None:
+            local_http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+            self._local.http = local_http
+        return HttpRequest(local_http, *args, **kwargs)
+    
+    def _execute_with_retry(self, request, idempotent: bool = True,
+                            max_attempts: Optional[int] = None):
+        """
+        Execute an API (or batch) request within the in-flight cap
+        
+        Rate-limit rejections (429, rateLimitExceeded) are retried with
+        exponential backoff plus jitter; transient server errors (500, 503)
+        only when idempotent, since a send or create may already have gone
+        through. The slot is released while waiting. Other errors, and the
+        last failed attempt, raise as before.
+        """
+        attempts = max(1, max_attempts or Config.GMAIL_MAX_ATTEMPTS)
+        for attempt in range(attempts):
+            try:
+                with self._inflight:
+                    return request.execute()
+            except HttpError as error:
+                if attempt == attempts - 1 or not _is_retryable(error, idempotent):
+                    raise
+                delay = min(64, 2 ** attempt) + random.random()
+                logger.warning("Gmail API error %s, retrying in %.1fs (attempt %d/%d)",
+                               error.resp.status, delay, attempt + 1, attempts)
+                time.sleep(delay)
+    
     def fetch_emails(self, query: str = '', max_results: int = 100, 
                      time_range_days: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -80,6 +155,22 @@ class GmailClient:
             max_results: Maximum number of emails to fetch
             time_range_days: Only fetch emails from last N days
         """
+        return [
+            message
+            for page in self.fetch_email_pages(query, max_results, time_range_days)
+            for message in page
+        ]
+    
+    def fetch_email_pages(self, query: str = '', max_results: int = 100,
+                          time_range_days: Optional[int] = None,
+                          page_size: int = _BATCH_LIMIT) -> Iterator[List[Dict[str, Any]]]:
+        """
+        D1: Fetch Emails, one page of message stubs at a time
+        
+        Pages hold at most page_size stubs (by default one batch request's
+        worth) and are requested lazily, so callers can process a page
+        before the next one is listed.
+        """
         try:
             # Build query with time range
             if time_range_days:
@@ -88,32 +179,41 @@ class GmailClient:
             
             logger.info(f"Fetching emails with query: '{query}'")
             
-            # Fetch message list
-            results = self.service.users().messages().list(
-                userId='me',
-                q=query,
-                maxResults=max_results
-            ).execute()
-            
-            messages = results.get('messages', [])
-            logger.info(f"✓ Fetched {len(messages)} email(s)")
+            fetched = 0
+            page_token = None
+            while fetched < max_results:
+                # Fetch message list
+                results = self._execute_with_retry(self.service.users().messages().list(
+                    userId='me',
+                    q=query,
+                    maxResults=min(page_size, max_results - fetched),
+                    pageToken=page_token
+                ))
+                
+                messages = results.get('messages', [])
+                if messages:
+                    fetched += len(messages)
+                    yield messages
+                
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
             
-            return messages
+            logger.info(f"✓ Fetched {fetched} email(s)")
             
         except HttpError as error:
             logger.error(f"Error fetching emails: {error}")
-            return []
     
     def get_email_details(self, message_id: str) -> Optional[Dict[str, Any]]:
         """
         D2: Get full email details
         """
         try:
-            message = self.service.users().messages().get(
+            message = self._execute_with_retry(self.service.users().messages().get(
                 userId='me',
                 id=message_id,
                 format='full'
-            ).execute()
+            ))
             
             return message
             
@@ -121,6 +221,80 @@ class GmailClient:
             logger.error(f"Error getting email details: {error}")
             return None
     
+    def get_email_details_batch(self, message_ids: List[str],
+                                format: str = 'full',
+                                fields: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        D2: Get details for many emails with batched API calls
+        
+        Sends one HTTP request per batch of messages instead of one per
+        message; parts rejected by rate limiting are re-batched. fields
+        optionally limits each response to those fields (partial response,
+        e.g. 'id,threadId'). Returns a dict keyed by message id; messages
+        that still fail are left out.
+        """
+        # Only send the fields parameter when asked for
+        extra = {'fields': fields} if fields else {}
+        results: Dict[str, Dict[str, Any]] = {}
+        
+        def _collect(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"Error getting email details for {request_id}: {exception}")
+            else:
+                results[request_id] = response
+        
+        messages = self.service.users().messages()
+        self._execute_batches(
+            message_ids,
+            lambda message_id: messages.get(userId='me', id=message_id, format=format, **extra),
+            _collect
+        )
+        return results
+    
+    def _execute_batches(self, request_ids: List[str],
+                         build_request: Callable[[str], HttpRequest],
+                         callback: Callable[[str, Any, Optional[Exception]], None],
+                         idempotent: bool = True):
+        """
+        Execute one API call per request id in batches of _BATCH_LIMIT
+        
+        Gmail rate-limits the parts of a batch individually, so parts that
+        fail with a retryable error (see _is_retryable) are collected and
+        re-batched with the same backoff as _execute_with_retry. callback
+        receives the final (request_id, response, exception) of every part.
+        """
+        pending = list(request_ids)
+        attempts = max(1, Config.GMAIL_MAX_ATTEMPTS)
+        for attempt in range(attempts):
+            retry: List[str] = []
+            last = attempt == attempts - 1
+            
+            def _collect(request_id, response, exception):
+                if (exception is not None and not last
+                        and isinstance(exception, HttpError)
+                        and _is_retryable(exception, idempotent)):
+                    retry.append(request_id)
+                else:
+                    callback(request_id, response, exception)
+            
+            for start in range(0, len(pending), _BATCH_LIMIT):
+                batch = self.service.new_batch_http_request(callback=_collect)
+                for request_id in pending[start:start + _BATCH_LIMIT]:
+                    batch.add(build_request(request_id), request_id=request_id)
+                try:
+                    self._execute_with_retry(batch, idempotent)
+                except (HttpError,) + _TRANSPORT_ERRORS as error:
+                    # Only this sub-batch is lost; its parts get no callback
+                    logger.error(f"Error executing batch request: {error}")
+            
+            if not retry:
+                return
+            delay = min(64, 2 ** attempt) + random.random()
+            logger.warning("%d batched call(s) rate-limited, retrying in %.1fs (attempt %d/%d)",
+                           len(retry), delay, attempt + 1, attempts)
+            time.sleep(delay)
+            pending = retry
+    
     def extract_metadata(self, message: Dict[str, Any]) -> EmailMetadata:
         """
         D4: Metadata Extraction
@@ -152,7 +326,6 @@ class GmailClient:
         # Parse date
         date_str = headers.get('Date', '')
         try:
-            from email.utils import parsedate_to_datetime
             date = parsedate_to_datetime(date_str)
         except:
             date = datetime.now()
@@ -182,15 +355,12 @@ class GmailClient:
         if not email_string:
             return []
         
-        import re
         # Extract email addresses using regex
-        email_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-        return re.findall(email_pattern, email_string)
+        return _ADDRESS_RE.findall(email_string)
     
     def _extract_name(self, from_header: str) -> Optional[str]:
         """Extract sender name from From header"""
-        import re
-        match = re.match(r'^(.*?)\s*<', from_header)
+        match = _NAME_RE.match(from_header)
         if match:
             return match.group(1).strip(' "')
         return None
@@ -201,6 +371,81 @@ class GmailClient:
         """
         Create draft email in Gmail and return draft ID, or None on failure.
         """
+        if not self.service:
+            logger.error("Gmail service not initialized. Cannot create draft.")
+            return None
+
+        try:
+            raw = self._build_raw_message(to, subject, body, cc, bcc, in_reply_to)
+
+            draft = self._execute_with_retry(self.service.users().drafts().create(
+                userId='me',
+                body={'message': {'raw': raw}}
+            ), idempotent=False)
+
+            draft_id = draft.get('id')
+            logger.info(f"✓ Draft created in Gmail: {draft_id}")
+            return draft_id
+
+        except HttpError as error:
+            logger.error(f"Error creating draft: {error}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error creating draft: {e}")
+            return None
+
+    def create_drafts_batch(self, specs: List[Dict[str, Any]]) -> Tuple[List[Optional[str]], List[int]]:
+        """
+        Create many drafts with batched API calls
+        
+        Each spec holds the keyword arguments of create_draft. Sends one HTTP
+        request per batch of drafts instead of one per draft; a failed
+        sub-batch never discards the drafts other sub-batches created.
+        
+        Returns:
+            (draft IDs in spec order with None where creation failed, indices
+            of the failed drafts that Gmail certainly did not create and that
+            are safe to resubmit). A 5xx part or a sub-batch lost in transit
+            may have been created anyway, so those are not in the second list.
+        """
+        draft_ids: List[Optional[str]] = [None] * len(specs)
+        resubmit: List[int] = []
+        if not self.service:
+            logger.error("Gmail service not initialized. Cannot create drafts.")
+            return draft_ids, resubmit
+        
+        raws: Dict[str, str] = {}
+        for i, spec in enumerate(specs):
+            try:
+                raws[str(i)] = self._build_raw_message(**spec)
+            except Exception as e:
+                logger.error(f"Error building draft {i}: {e}")
+                resubmit.append(i)
+        
+        def _collect(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"Error creating draft {request_id}: {exception}")
+                # Still rate-limited after every attempt: rejected, never created
+                if isinstance(exception, HttpError) and _is_retryable(exception, idempotent=False):
+                    resubmit.append(int(request_id))
+            else:
+                draft_ids[int(request_id)] = response.get('id')
+        
+        drafts = self.service.users().drafts()
+        self._execute_batches(
+            list(raws),
+            lambda request_id: drafts.create(userId='me', body={'message': {'raw': raws[request_id]}}),
+            _collect,
+            idempotent=False
+        )
+        
+        logger.info(f"✓ Created {sum(1 for d in draft_ids if d)}/{len(specs)} draft(s) in Gmail")
+        return draft_ids, sorted(resubmit)
+
+    def _build_raw_message(self, to: List[str], subject: str, body: str,
+                           cc: Optional[List[str]] = None, bcc: Optional[List[str]] = None,
+                           in_reply_to: Optional[str] = None) -> str:
+        """Build the base64url-encoded MIME message of a draft"""
         def _flatten(x):
             if not x:
                 return []
@@ -218,48 +463,27 @@ class GmailClient:
         cc = _flatten(cc)
         bcc = _flatten(bcc)
 
-        if not self.service:
-            logger.error("Gmail service not initialized. Cannot create draft.")
-            return None
-
-        try:
-            message = MIMEMultipart()
-            message['to'] = ', '.join(to)
-            if cc:
-                message['cc'] = ', '.join(cc)
-            message['subject'] = subject
+        message = MIMEMultipart()
+        message['to'] = ', '.join(to)
+        if cc:
+            message['cc'] = ', '.join(cc)
+        message['subject'] = subject
 
-            if in_reply_to:
-                # Use message-id value if available; keep headers safe
-                message['In-Reply-To'] = in_reply_to
-                message['References'] = in_reply_to
+        if in_reply_to:
+            # Use message-id value if available; keep headers safe
+            message['In-Reply-To'] = in_reply_to
+            message['References'] = in_reply_to
 
-            message.attach(MIMEText(body, 'plain'))
+        message.attach(MIMEText(body, 'plain'))
 
-            raw = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        return base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
 
-            draft = self.service.users().drafts().create(
-                userId='me',
-                body={'message': {'raw': raw}}
-            ).execute()
-
-            draft_id = draft.get('id')
-            logger.info(f"✓ Draft created in Gmail: {draft_id}")
-            return draft_id
-
-        except HttpError as error:
-            logger.error(f"Error creating draft: {error}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error creating draft: {e}")
-            return None
-            
     def send_draft(self, draft_id: str):
-        logger.info(f"Sending draft: {draft_id}")
-        result = self.service.users().drafts().send(
+        logger.info("Sending draft: %s", draft_id)
+        result = self._execute_with_retry(self.service.users().drafts().send(
             userId="me",
             body={"id": draft_id}
-        ).execute()
+        ), idempotent=False)
         return result.get("id")
 
     def send_email(self, draft_id: Optional[str] = None, 
@@ -269,26 +493,30 @@ class GmailClient:
         """
         Send email (from draft or new)
         """
-        logger.info("="*60)
-        logger.info("📧 GMAIL_CLIENT.send_email() called")
-        logger.info(f"   draft_id: {draft_id}")
-        logger.info(f"   to: {to}")
-        logger.info(f"   subject: {subject}")
-        logger.info(f"   body length: {len(body) if body else 0}")
+        verbose = logger.isEnabledFor(logging.INFO)
+        if verbose:
+            logger.info(_SEP)
+            logger.info("📧 GMAIL_CLIENT.send_email() called")
+            logger.info("   draft_id: %s", draft_id)
+            logger.info("   to: %s", to)
+            logger.info("   subject: %s", subject)
+            logger.info("   body length: %s", len(body) if body else 0)
         
         try:
             if draft_id:
-                logger.info(f"   Sending existing draft with ID: {draft_id}")
-                logger.info("   Calling Gmail API: users().drafts().send()...")
+                if verbose:
+                    logger.info("   Sending existing draft with ID: %s", draft_id)
+                    logger.info("   Calling Gmail API: users().drafts().send()...")
                 
-                response = self.service.users().drafts().send(
+                response = self._execute_with_retry(self.service.users().drafts().send(
                     userId='me',
                     body={'id': draft_id}
-                ).execute()
+                ), idempotent=False)
                 
-                logger.info(f"   ✓ Gmail API response: {response}")
-                logger.info(f"   Message ID: {response.get('id', 'N/A')}")
-                logger.info(f"   Thread ID: {response.get('threadId', 'N/A')}")
+                if verbose:
+                    logger.info("   ✓ Gmail API response: %s", response)
+                    logger.info("   Message ID: %s", response.get('id', 'N/A'))
+                    logger.info("   Thread ID: %s", response.get('threadId', 'N/A'))
             else:
                 logger.info("   Sending new message (not from draft)")
                 # Send new message
@@ -299,31 +527,31 @@ class GmailClient:
                 raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
                 
                 logger.info("   Calling Gmail API: users().messages().send()...")
-                response = self.service.users().messages().send(
+                response = self._execute_with_retry(self.service.users().messages().send(
                     userId='me',
                     body={'raw': raw}
-                ).execute()
+                ), idempotent=False)
                 
-                logger.info(f"   ✓ Gmail API response: {response}")
-                logger.info(f"   Message ID: {response.get('id', 'N/A')}")
+                if verbose:
+                    logger.info("   ✓ Gmail API response: %s", response)
+                    logger.info("   Message ID: %s", response.get('id', 'N/A'))
             
             logger.info("✅ Email sent successfully!")
-            logger.info("="*60)
+            logger.info(_SEP)
             return True
             
         except HttpError as error:
             logger.error("❌ Gmail API HttpError occurred")
-            logger.error(f"   Error: {error}")
-            logger.error(f"   Status code: {error.resp.status if hasattr(error, 'resp') else 'N/A'}")
-            logger.error(f"   Reason: {error.error_details if hasattr(error, 'error_details') else 'N/A'}")
-            logger.info("="*60)
+            logger.error("   Error: %s", error)
+            logger.error("   Status code: %s", error.resp.status if hasattr(error, 'resp') else 'N/A')
+            logger.error("   Reason: %s", error.error_details if hasattr(error, 'error_details') else 'N/A')
+            logger.info(_SEP)
             return False
         except Exception as e:
-            logger.error(f"❌ Unexpected exception: {e}")
-            logger.error(f"   Exception type: {type(e).__name__}")
-            import traceback
+            logger.error("❌ Unexpected exception: %s", e)
+            logger.error("   Exception type: %s", type(e).__name__)
             logger.error(traceback.format_exc())
-            logger.info("="*60)
+            logger.info(_SEP)
             return False
     
     def get_threads(self, message_ids: List[str]) -> Dict[str, List[str]]:
@@ -334,21 +562,43 @@ class GmailClient:
         """
         thread_map = {}
         
+        # Only the thread id is needed: skip labels, snippet and size
+        messages = self.get_email_details_batch(
+            message_ids, format='minimal', fields='id,threadId'
+        )
         for msg_id in message_ids:
-            try:
-                msg = self.service.users().messages().get(
-                    userId='me',
-                    id=msg_id,
-                    format='minimal'
-                ).execute()
-                
-                thread_id = msg['threadId']
-                if thread_id not in thread_map:
-                    thread_map[thread_id] = []
-                thread_map[thread_id].append(msg_id)
-                
-            except HttpError as error:
-                logger.error(f"Error mapping thread for {msg_id}: {error}")
+            msg = messages.get(msg_id)
+            if msg:
+                thread_map.setdefault(msg['threadId'], []).append(msg_id)
         
         logger.info(f"✓ Mapped {len(message_ids)} messages into {len(thread_map)} threads")
         return thread_map
+
+
+def _is_retryable(error: HttpError, idempotent: bool = True) -> bool:
+    """True for rate-limit rejections, and transient server errors when idempotent"""
+    status = error.resp.status
+    if status in _RATE_LIMIT_STATUSES:
+        return True
+    if idempotent and status in _TRANSIENT_STATUSES:
+        return True
+    content = error.content or b''
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', 'replace')
+    return any(reason in content for reason in _RATE_LIMIT_REASONS)
+
+
+def get_gmail_client() -> GmailClient:
+    """
+    Return the process-wide GmailClient, authenticating and building the
+    API service on first use only
+
+    The credentials refresh themselves, so one client serves the whole
+    session; callers no longer pay OAuth and discovery setup per use.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = GmailClient()
+    return _shared_client